@@ -1,8 +1,9 @@
 import os
 import json
 import logging
+import threading
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Dict, Any, Iterable, Callable
 import firebase_admin
 from firebase_admin import credentials, firestore, auth
 
@@ -10,11 +11,22 @@ logger = logging.getLogger(__name__)
 
 _firebase_app: Optional[firebase_admin.App] = None
 _firestore_db: Optional[firestore.Client] = None
+_firestore_lock = threading.Lock()
+
+# Parsed service-account Certificate; None with _cred_loaded=True means "use default credentials"
+_cred_cache: Optional[credentials.Certificate] = None
+_cred_loaded = False
 
 
 def init_firebase() -> None:
-    """Initialize Firebase Admin SDK."""
-    global _firebase_app, _firestore_db
+    """Initialize Firebase Admin SDK and warm the Firestore client."""
+    init_firebase_app()
+    _ensure_firestore()
+
+
+def init_firebase_app() -> None:
+    """Initialize the Firebase Admin app (idempotent; does not open any gRPC channel)."""
+    global _firebase_app
     
     if _firebase_app is not None:
         logger.info("Firebase already initialized")
@@ -28,42 +40,7 @@ def init_firebase() -> None:
             logger.error(error_msg)
             raise RuntimeError(error_msg)
         
-        cred = None
-        
-        # Priority 1: Check for JSON string in environment variable
-        credentials_json = os.getenv('FIREBASE_CREDENTIALS_JSON')
-        if credentials_json:
-            try:
-                # Try to parse the JSON
-                cred_dict = json.loads(credentials_json)
-                # Validate that it has required fields
-                if not isinstance(cred_dict, dict):
-                    raise ValueError("FIREBASE_CREDENTIALS_JSON must be a JSON object")
-                if 'type' not in cred_dict or cred_dict.get('type') != 'service_account':
-                    logger.warning("FIREBASE_CREDENTIALS_JSON may not be a valid service account JSON")
-                cred = credentials.Certificate(cred_dict)
-                logger.info("Using Firebase credentials from FIREBASE_CREDENTIALS_JSON environment variable")
-            except json.JSONDecodeError as e:
-                # Show a preview of the malformed JSON to help debug
-                preview = credentials_json[:100] if len(credentials_json) > 100 else credentials_json
-                logger.error(f"Failed to parse FIREBASE_CREDENTIALS_JSON: {e}")
-                logger.error(f"JSON preview (first 100 chars): {preview}")
-                logger.error("Tip: If the JSON contains special characters, make sure it's properly escaped.")
-                logger.error("Alternative: Use FIREBASE_CREDENTIALS_PATH to point to a JSON file instead.")
-                raise RuntimeError(f"Invalid JSON in FIREBASE_CREDENTIALS_JSON: {e}. Use FIREBASE_CREDENTIALS_PATH as an alternative.") from e
-            except ValueError as e:
-                logger.error(f"Invalid Firebase credentials format: {e}")
-                raise RuntimeError(f"Invalid Firebase credentials format: {e}") from e
-        else:
-            # Priority 2: Check for file path
-            credentials_path = os.getenv('FIREBASE_CREDENTIALS_PATH') or os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
-            if credentials_path:
-                cred_path = Path(credentials_path)
-                if not cred_path.exists():
-                    logger.warning(f"Firebase credentials file not found at {credentials_path}. Trying default credentials.")
-                else:
-                    cred = credentials.Certificate(str(cred_path))
-                    logger.info(f"Using Firebase credentials from file: {credentials_path}")
+        cred = _load_credentials()
         
         # Initialize Firebase app
         if cred:
@@ -80,16 +57,103 @@ def init_firebase() -> None:
                 logger.error(error_msg)
                 raise RuntimeError(error_msg)
         
-        # Initialize Firestore
+        logger.info(f"Firebase initialized successfully for project: {project_id}")
+        
+    except RuntimeError:
+        # Re-raise RuntimeError as-is
+        raise
+    except Exception as e:
+        logger.error(f"Failed to initialize Firebase: {e}")
+        raise RuntimeError(f"Failed to initialize Firebase: {e}") from e
+
+
+def _load_credentials() -> Optional[credentials.Certificate]:
+    """
+    Resolve the service-account Certificate from the environment, once per process.
+    
+    Returns None when no explicit credentials are configured, in which case the
+    caller falls back to application default credentials.
+    
+    Raises:
+        RuntimeError: If FIREBASE_CREDENTIALS_JSON is present but malformed
+    """
+    global _cred_cache, _cred_loaded
+    
+    if _cred_loaded:
+        return _cred_cache
+    
+    cred = None
+    
+    # Priority 1: Check for JSON string in environment variable
+    credentials_json = os.getenv('FIREBASE_CREDENTIALS_JSON')
+    if credentials_json:
+        try:
+            # Try to parse the JSON
+            cred_dict = json.loads(credentials_json)
+            # Validate that it has required fields
+            if not isinstance(cred_dict, dict):
+                raise ValueError("FIREBASE_CREDENTIALS_JSON must be a JSON object")
+            if 'type' not in cred_dict or cred_dict.get('type') != 'service_account':
+                logger.warning("FIREBASE_CREDENTIALS_JSON may not be a valid service account JSON")
+            cred = credentials.Certificate(cred_dict)
+            logger.info("Using Firebase credentials from FIREBASE_CREDENTIALS_JSON environment variable")
+        except json.JSONDecodeError as e:
+            # Show a preview of the malformed JSON to help debug
+            preview = credentials_json[:100] if len(credentials_json) > 100 else credentials_json
+            logger.error(f"Failed to parse FIREBASE_CREDENTIALS_JSON: {e}")
+            logger.error(f"JSON preview (first 100 chars): {preview}")
+            logger.error("Tip: If the JSON contains special characters, make sure it's properly escaped.")
+            logger.error("Alternative: Use FIREBASE_CREDENTIALS_PATH to point to a JSON file instead.")
+            raise RuntimeError(f"Invalid JSON in FIREBASE_CREDENTIALS_JSON: {e}. Use FIREBASE_CREDENTIALS_PATH as an alternative.") from e
+        except ValueError as e:
+            logger.error(f"Invalid Firebase credentials format: {e}")
+            raise RuntimeError(f"Invalid Firebase credentials format: {e}") from e
+    else:
+        # Priority 2: Check for file path
+        credentials_path = os.getenv('FIREBASE_CREDENTIALS_PATH') or os.getenv('GOOGLE_APPLICATION_CREDENTIALS')
+        if credentials_path:
+            cred_path = Path(credentials_path)
+            if not cred_path.exists():
+                logger.warning(f"Firebase credentials file not found at {credentials_path}. Trying default credentials.")
+            else:
+                cred = credentials.Certificate(str(cred_path))
+                logger.info(f"Using Firebase credentials from file: {credentials_path}")
+    
+    _cred_cache = cred
+    _cred_loaded = True
+    return cred
+
+
+def _ensure_firestore() -> firestore.Client:
+    """
+    Create the Firestore client on first use and reuse it afterwards.
+    
+    Raises:
+        RuntimeError: If Firebase is not initialized or the client cannot be created
+    """
+    global _firestore_db
+    
+    if _firestore_db is not None:
+        return _firestore_db
+    
+    with _firestore_lock:
+        if _firestore_db is not None:
+            return _firestore_db
+        
+        if _firebase_app is None:
+            raise RuntimeError("Firebase not initialized. Call init_firebase() first.")
+        
+        project_id = os.getenv('FIREBASE_PROJECT_ID')
+        
         # Allow specifying a database ID (defaults to "(default)")
         database_id = os.getenv('FIREBASE_DATABASE_ID', '(default)')
         try:
             if database_id == '(default)':
                 # For default database, don't specify database parameter
-                _firestore_db = firestore.client()
+                client = firestore.client()
             else:
                 # For named databases, specify the database ID
-                _firestore_db = firestore.client(database_id=database_id)
+                client = firestore.client(database_id=database_id)
             logger.info(f"Firestore initialized with database: {database_id}")
         except Exception as e:
             error_msg = f"Failed to initialize Firestore with database '{database_id}': {e}"
@@ -103,14 +167,8 @@ def init_firebase() -> None:
                 logger.error(f"4. Check your databases at: https://console.cloud.google.com/firestore/databases?project={project_id}")
             raise RuntimeError(error_msg) from e
         
-        logger.info(f"Firebase initialized successfully for project: {project_id}")
-        
-    except RuntimeError:
-        # Re-raise RuntimeError as-is
-        raise
-    except Exception as e:
-        logger.error(f"Failed to initialize Firebase: {e}")
-        raise RuntimeError(f"Failed to initialize Firebase: {e}") from e
+        _firestore_db = client
+        return _firestore_db
 
 
 def get_firebase_app() -> Optional[firebase_admin.App]:
@@ -121,10 +179,57 @@ def get_firebase_app() -> Optional[firebase_admin.App]:
 
 
 def get_firestore() -> Optional[firestore.Client]:
-    """Get the Firestore database client."""
-    if _firestore_db is None:
-        logger.warning("Firestore not initialized. Call init_firebase() first.")
-    return _firestore_db
+    """Get the Firestore database client, creating it on first use."""
+    # Fast path for every request after startup: the client is already built
+    if _firestore_db is not None:
+        return _firestore_db
+    try:
+        return _ensure_firestore()
+    except RuntimeError as e:
+        logger.warning(f"Firestore not available: {e}")
+        return None
+
+
+def timestamps_to_iso(data: Dict[str, Any], fields: Iterable[str]) -> None:
+    """Convert the given Firestore timestamp fields of a document dict to ISO strings in place."""
+    for key in fields:
+        value = data.get(key)
+        if value is not None:
+            isoformat = getattr(value, 'isoformat', None)
+            if isoformat is not None:
+                data[key] = isoformat()
+
+
+def snapshot_to_dict(doc: Any, timestamp_fields: Iterable[str]) -> Dict[str, Any]:
+    """Convert a document snapshot to a response dict with its id and ISO timestamps."""
+    data = doc.to_dict()
+    data['id'] = doc.id
+    timestamps_to_iso(data, timestamp_fields)
+    return data
+
+
+# Firestore caps a WriteBatch at 500 writes
+_MAX_BATCH_WRITES = 500
+
+
+def commit_in_batches(db: firestore.Client, writes: Iterable[Callable[[Any], Any]]) -> None:
+    """Apply each write to a WriteBatch, committing every 500 writes and once more at the end.
+    
+    Each item in `writes` takes the current batch and adds one write to it. The first
+    500 writes commit atomically, so a precondition on the first write (e.g.
+    exists=True) stops the whole first batch from being applied.
+    """
+    batch = db.batch()
+    pending = 0
+    for write in writes:
+        write(batch)
+        pending += 1
+        if pending == _MAX_BATCH_WRITES:
+            batch.commit()
+            batch = db.batch()
+            pending = 0
+    if pending:
+        batch.commit()
 
 
 def get_auth() -> auth.Client:
@@ -132,4 +237,3 @@ def get_auth() -> auth.Client:
     if _firebase_app is None:
         raise RuntimeError("Firebase not initialized. Call init_firebase() first.")
     return auth.Client(app=_firebase_app)
-
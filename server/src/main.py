@@ -1,54 +1,181 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 import os
 import sys
+import atexit
+import queue
+import asyncio
+import importlib
 import logging
+from contextlib import asynccontextmanager
+from logging.handlers import QueueHandler, QueueListener
 from pathlib import Path
 
 
 
+SERVER_DIR = Path(__file__).resolve().parent.parent
+UPLOADS_DIR = SERVER_DIR / "uploads"
+
 # Add parent directory to path to allow imports
-server_dir = Path(__file__).parent.parent
-if str(server_dir) not in sys.path:
-    sys.path.insert(0, str(server_dir))
+if str(SERVER_DIR) not in sys.path:
+    sys.path.insert(0, str(SERVER_DIR))
 
 from src.db.firebase import init_firebase
-from src.routes import auth, characters, sessions, campaigns, scribe_token, analyze, images, ioun, conversations
 
 # Load environment variables
 load_dotenv()
 
+class _CachedTimeFormatter(logging.Formatter):
+    """Formatter that renders %(asctime)s once per second instead of once per record."""
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._cached_second = None
+        self._cached_time = ''
+    
+    def formatTime(self, record, datefmt=None):
+        # Only valid while datefmt has second resolution
+        second = int(record.created)
+        if second != self._cached_second:
+            self._cached_time = super().formatTime(record, datefmt)
+            self._cached_second = second
+        return self._cached_time
+
+
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(_CachedTimeFormatter(
+    fmt='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     datefmt='%Y-%m-%d %H:%M:%S'
-)
+))
+# Log calls only enqueue the record; a listener thread does the stream writes, so
+# request handlers never block on stderr
+_log_queue = queue.SimpleQueue()
+_log_listener = QueueListener(_log_queue, _log_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+# The queue side only renders the message (plus traceback); the listener's
+# handler applies the real format
+_queue_handler = QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
+class _APIGZipMiddleware(GZipMiddleware):
+    """GZipMiddleware that leaves /api/images responses alone.
+    
+    Those are PNG/JPEG/GIF/WebP bodies that are already compressed, and the largest
+    responses the server sends, so re-gzipping them only costs CPU.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("/api/images/"):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+def _init_backends() -> None:
+    """Blocking startup work; runs in a worker thread so the event loop stays free."""
+    # Initialize Firebase (for authentication and user data)
+    try:
+        init_firebase()
+        logger.info("Firebase initialized successfully")
+    except Exception as e:
+        logger.error(f"Firebase initialization failed: {e}")
+        logger.error("Authentication endpoints will not work without Firebase.")
+        # Log what's missing
+        if not os.getenv('FIREBASE_PROJECT_ID'):
+            logger.error("  - FIREBASE_PROJECT_ID is not set")
+        if not os.getenv('FIREBASE_CREDENTIALS_JSON') and not os.getenv('FIREBASE_CREDENTIALS_PATH') and not os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
+            logger.error("  - Firebase credentials not found. Set one of: FIREBASE_CREDENTIALS_JSON, FIREBASE_CREDENTIALS_PATH, or GOOGLE_APPLICATION_CREDENTIALS")
+    
+    # Ensure uploads directory exists for character images
+    character_images_dir = UPLOADS_DIR / "character_images"
+    if not character_images_dir.is_dir():
+        character_images_dir.mkdir(parents=True, exist_ok=True)
+    logger.info(f"Character images directory: {character_images_dir}")
+
+
+# Route modules as (module, prefix, tags), in registration order. Modules are
+# imported at startup rather than at import time of this file.
+ROUTES = [
+    ("src.routes.auth", "/api/auth", ["auth"]),
+    ("src.routes.campaigns", "/api/campaigns", ["campaigns"]),
+    ("src.routes.characters", "/api/characters", ["characters"]),
+    ("src.routes.sessions", "/api/sessions", ["sessions"]),
+    ("src.routes.analyze", "/api", ["analyze"]),
+    ("src.routes.scribe_token", "", ["scribe"]),
+    ("src.routes.ioun", "/api", ["ioun"]),
+    ("src.routes.conversations", "/api/conversations", ["conversations"]),
+    ("src.routes.images", "/api/images", ["images"]),
+]
+
+
+async def _register_routes(app: FastAPI) -> None:
+    """Import all route modules concurrently in the executor, then include them in order."""
+    loop = asyncio.get_running_loop()
+    modules = await asyncio.gather(*[
+        loop.run_in_executor(None, importlib.import_module, module_name)
+        for module_name, _, _ in ROUTES
+    ])
+    for module, (_, prefix, tags) in zip(modules, ROUTES):
+        app.include_router(module.router, prefix=prefix, tags=tags)
+    
+    # Serve legacy local images in development only; on Cloud Run (K_SERVICE is set)
+    # images live in GCS and are served through the cached /api/images/gcs proxy.
+    # Mounted after the routers so it does not shadow /api/images/gcs.
+    if UPLOADS_DIR.exists() and not os.getenv("K_SERVICE"):
+        app.mount("/api/images", StaticFiles(directory=str(UPLOADS_DIR)), name="images")
+
+
+# Initialize backends on startup (replaces the deprecated on_event hook)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("Starting D&D Tracker Server...")
+    
+    # Run Firebase init in a worker thread, concurrently with the route imports. Both
+    # must finish before startup completes: uvicorn only accepts connections once the
+    # lifespan has yielded, and routes depend on an initialized Firebase app.
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(
+        loop.run_in_executor(None, _init_backends),
+        _register_routes(app)
+    )
+    logger.info("Server ready to accept requests")
+    
+    yield
+
+
 # Initialize FastAPI app
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 # Add exception handler for validation errors
+MAX_VALIDATION_ERRORS = 20
+
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
     """Provide detailed validation error messages."""
-    errors = []
-    for error in exc.errors():
-        field = ".".join(str(loc) for loc in error["loc"])
-        message = error["msg"]
-        errors.append(f"{field}: {message}")
+    # Report at most the first few errors, and only their type/loc/msg: "input" can
+    # echo back an entire transcript and "ctx" may hold non-serializable exceptions
+    errors = [
+        {"type": error["type"], "loc": error["loc"], "msg": error["msg"]}
+        for error in exc.errors()[:MAX_VALIDATION_ERRORS]
+    ]
     
-    error_message = "Validation error: " + "; ".join(errors)
+    error_message = "Validation error: " + "; ".join(
+        f"{'.'.join(str(loc) for loc in error['loc'])}: {error['msg']}" for error in errors
+    )
     logger.warning(f"Validation error on {request.url.path}: {error_message}")
     
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
-        content={"detail": error_message, "errors": exc.errors()}
+        content={"detail": error_message, "errors": errors}
     )
 
 # Configure CORS
@@ -78,66 +205,49 @@ logger.info(f"CORS allowed origins: {allowed_origins}")
 
 
 
+# Compress larger JSON responses (e.g. /analyze with previous_chunk_for_next_analysis).
+# Added before CORS so CORS stays the outermost middleware.
+app.add_middleware(_APIGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=allowed_origins,
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH"],
-    allow_headers=["*"],
-    expose_headers=["*"],
-    max_age=3600,
+    # Only the headers the SPA actually sends (axios in src/services/api.ts)
+    allow_headers=["Authorization", "Content-Type"],
+    # Pagination cursor of GET /campaigns
+    expose_headers=["X-Next-Cursor"],
+    # Let browsers cache preflights for a day (Firefox's cap; Chrome clamps to 2h)
+    max_age=86400,
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Starting D&D Tracker Server...")
-    
-    # Initialize Firebase (for authentication and user data)
-    try:
-        init_firebase()
-        logger.info("Firebase initialized successfully")
-    except Exception as e:
-        logger.error(f"Firebase initialization failed: {e}")
-        logger.error("Authentication endpoints will not work without Firebase.")
-        # Log what's missing
-        if not os.getenv('FIREBASE_PROJECT_ID'):
-            logger.error("  - FIREBASE_PROJECT_ID is not set")
-        if not os.getenv('FIREBASE_CREDENTIALS_JSON') and not os.getenv('FIREBASE_CREDENTIALS_PATH') and not os.getenv('GOOGLE_APPLICATION_CREDENTIALS'):
-            logger.error("  - Firebase credentials not found. Set one of: FIREBASE_CREDENTIALS_JSON, FIREBASE_CREDENTIALS_PATH, or GOOGLE_APPLICATION_CREDENTIALS")
-    
-    # Ensure uploads directory exists for character images
-    server_dir = Path(__file__).parent.parent
-    uploads_dir = server_dir / "uploads" / "character_images"
-    uploads_dir.mkdir(parents=True, exist_ok=True)
-    logger.info(f"Character images directory: {uploads_dir}")
-    
-    logger.info("Server ready to accept requests")
-
 # Health check endpoint
 @app.get("/api/health")
 async def health_check():
     return {"status": "ok", "message": "Server is running"}
 
-# Register routes
-app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
-app.include_router(campaigns.router, prefix="/api/campaigns", tags=["campaigns"])
-app.include_router(characters.router, prefix="/api/characters", tags=["characters"])
-app.include_router(sessions.router, prefix="/api/sessions", tags=["sessions"])
-app.include_router(analyze.router, prefix="/api", tags=["analyze"])
-app.include_router(scribe_token.router, tags=["scribe"])
-app.include_router(ioun.router, prefix="/api", tags=["ioun"])
-app.include_router(conversations.router, prefix="/api/conversations", tags=["conversations"])
-app.include_router(images.router, prefix="/api/images", tags=["images"])
-
-# Serve static images
-server_dir = Path(__file__).parent.parent
-uploads_dir = server_dir / "uploads"
-if uploads_dir.exists():
-    app.mount("/api/images", StaticFiles(directory=str(uploads_dir)), name="images")
 
 if __name__ == "__main__":
     import uvicorn
     port = int(os.getenv("PORT", 3001))
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    # Import string (not the app object) is required for workers > 1; each worker
+    # runs the lifespan handler and builds its own Firestore client
+    workers = int(os.getenv("WEB_CONCURRENCY", max(2, (os.cpu_count() or 1) * 2 + 1)))
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        port=port,
+        loop="uvloop",
+        http="httptools",
+        workers=workers,
+        # Answer 503 past this many in-flight connections per worker instead of
+        # queueing without bound. No limit_max_requests: uvicorn 0.27's multiprocess
+        # supervisor does not respawn workers that exit, so recycling would
+        # eventually leave no worker serving.
+        limit_concurrency=1000,
+        backlog=2048,
+        proxy_headers=True,
+        forwarded_allow_ips="*",
+    )
 
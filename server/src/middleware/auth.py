@@ -1,7 +1,58 @@
 from fastapi import HTTPException, Depends, Header
-from typing import Optional
-import jwt
+from typing import Optional, Dict, Tuple, Any
+import base64
+import binascii
+import hashlib
+import hmac
+import orjson
 import os
+import time
+
+# Read once at import so a missing secret fails at startup instead of on every request
+JWT_SECRET = os.getenv('JWT_SECRET')
+if not JWT_SECRET:
+    raise RuntimeError('JWT_SECRET not configured')
+
+_BEARER = 'bearer'
+
+# Every token we issue (create_custom_jwt) is HS256 with this exact header segment
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b'=')
+_JWT_KEY = JWT_SECRET.encode('utf-8')
+
+# Already-verified tokens: token -> (user_id, exp). Only touched from the event
+# loop thread, so a plain dict is enough; oldest entries are evicted first.
+_TOKEN_CACHE_MAX_ENTRIES = 4096
+_token_cache: Dict[str, Tuple[str, float]] = {}
+
+
+def _b64url_decode(segment: bytes) -> bytes:
+    """Decode an unpadded base64url JWT segment."""
+    return base64.urlsafe_b64decode(segment + b'=' * (-len(segment) % 4))
+
+
+def _decode_token(token: str) -> Optional[Dict[str, Any]]:
+    """
+    Verify an HS256 token's header and signature and return its claims.
+    
+    Returns:
+        The claims dict, or None if the token is malformed or the signature is wrong.
+        Expiry is left to the caller.
+    """
+    try:
+        header, payload, signature = token.encode('ascii').split(b'.')
+    except (UnicodeEncodeError, ValueError):
+        return None
+    if header != _JWT_HEADER_B64:
+        return None
+    
+    expected = hmac.new(_JWT_KEY, header + b'.' + payload, hashlib.sha256).digest()
+    try:
+        if not hmac.compare_digest(expected, _b64url_decode(signature)):
+            return None
+        claims = orjson.loads(_b64url_decode(payload))
+    except (binascii.Error, ValueError):
+        return None
+    return claims if isinstance(claims, dict) else None
 
 
 async def authenticate_token(authorization: Optional[str] = Header(None)) -> str:
@@ -15,26 +66,39 @@ async def authenticate_token(authorization: Optional[str] = Header(None)) -> str
     if not authorization:
         raise HTTPException(status_code=401, detail='Access token required')
     
-    # Extract token from "Bearer TOKEN" format
-    parts = authorization.split(' ')
-    if len(parts) != 2 or parts[0].lower() != 'bearer':
+    # Extract token from "Bearer TOKEN" format (exactly one space, like the old split check)
+    scheme, sep, token = authorization.partition(' ')
+    if not sep or scheme.lower() != _BEARER or not token or ' ' in token:
         raise HTTPException(status_code=401, detail='Access token required')
     
-    token = parts[1]
+    # Skip signature verification for tokens seen before, until they expire
+    cached = _token_cache.get(token)
+    if cached is not None:
+        user_id, exp = cached
+        if exp > time.time():
+            return user_id
+        del _token_cache[token]
     
-    jwt_secret = os.getenv('JWT_SECRET')
-    if not jwt_secret:
-        raise HTTPException(status_code=500, detail='JWT secret not configured')
+    decoded = _decode_token(token)
+    if decoded is None:
+        raise HTTPException(status_code=403, detail='Invalid or expired token')
     
-    try:
-        decoded = jwt.decode(token, jwt_secret, algorithms=['HS256'])
-        user_id = decoded.get('userId')
-        if not user_id:
-            raise HTTPException(status_code=403, detail='Invalid or expired token')
-        # user_id is now a Firebase UID (string) instead of integer
-        return str(user_id)
-    except jwt.ExpiredSignatureError:
+    # Same exp rules as PyJWT: optional, must be numeric, expired once exp <= now
+    exp = decoded.get('exp', 0)
+    if isinstance(exp, bool) or not isinstance(exp, (int, float)):
+        raise HTTPException(status_code=403, detail='Invalid or expired token')
+    if 'exp' in decoded and exp <= time.time():
         raise HTTPException(status_code=403, detail='Invalid or expired token')
-    except jwt.InvalidTokenError:
+    
+    user_id = decoded.get('userId')
+    if not user_id:
         raise HTTPException(status_code=403, detail='Invalid or expired token')
+    # user_id is now a Firebase UID (string) instead of integer
+    user_id = str(user_id)
+    
+    if len(_token_cache) >= _TOKEN_CACHE_MAX_ENTRIES:
+        _token_cache.pop(next(iter(_token_cache)))
+    _token_cache[token] = (user_id, float(exp))
+    
+    return user_id
 
@@ -1,6 +1,9 @@
 from fastapi import APIRouter, HTTPException, Depends
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List
+import asyncio
 import logging
 from ..middleware.auth import authenticate_token
 from ..db.firebase import get_firestore
@@ -14,13 +17,17 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Marks the end of the portion of a transcript that was analyzed by a previous call
+_MARKER = '[ALREADY_ANALYZED]'
+_MARKER_LEN = len(_MARKER)
+
 
 class AnalyzeRequest(BaseModel):
     transcript: str
     session_id: str
 
 
-async def _get_combat_context(db_firestore: Any, user_id: str, session_id: str) -> Dict[str, Any]:
+def _get_combat_context(db_firestore: Any, user_id: str, session_id: str) -> Dict[str, Any]:
     """
     Fetch combat context for a session from Firestore.
     
@@ -35,7 +42,9 @@ async def _get_combat_context(db_firestore: Any, user_id: str, session_id: str)
             "is_combat_active": bool
         }
     """
-    session_ref = db_firestore.collection('users').document(user_id).collection('sessions').document(str(session_id))
+    user_ref = db_firestore.collection('users').document(user_id)
+    session_ref = user_ref.collection('sessions').document(str(session_id))
+    characters_ref = user_ref.collection('characters')
     
     # Get combat state from Firestore
     combat_state_ref = session_ref.collection('combat_state').document('current')
@@ -49,42 +58,49 @@ async def _get_combat_context(db_firestore: Any, user_id: str, session_id: str)
         combat_state_data = combat_state_doc.to_dict()
         is_combat_active = combat_state_data.get('is_active', False)
         current_turn_character_id = combat_state_data.get('current_turn_character_id')
-        
-        # Get current turn character name if available
-        if current_turn_character_id:
-            char_ref = db_firestore.collection('users').document(user_id).collection('characters').document(str(current_turn_character_id))
-            char_doc = char_ref.get()
+    
+    initiative_entries = []
+    if is_combat_active:
+        initiative_entries = [doc.to_dict() for doc in session_ref.collection('initiative_order').stream()]
+    
+    # Collect every character whose name we still need and fetch them in one batched read
+    # instead of one get() per character
+    names_needed = set()
+    if current_turn_character_id:
+        names_needed.add(str(current_turn_character_id))
+    for data in initiative_entries:
+        character_name = data.get('character_name', 'Unknown')
+        if not character_name or character_name == 'Unknown':
+            names_needed.add(str(data.get('character_id')))
+    
+    character_names = {}
+    if names_needed:
+        char_refs = [characters_ref.document(character_id) for character_id in names_needed]
+        for char_doc in db_firestore.get_all(char_refs, field_paths=['name']):
             if char_doc.exists:
-                char_data = char_doc.to_dict()
-                current_turn_character_name = char_data.get('name')
+                character_names[char_doc.id] = char_doc.to_dict().get('name')
+    
+    if current_turn_character_id:
+        current_turn_character_name = character_names.get(str(current_turn_character_id))
     
     # Get active characters in initiative order
     active_characters = []
-    if is_combat_active:
-        initiative_order_ref = session_ref.collection('initiative_order')
-        all_orders = list(initiative_order_ref.stream())
+    for data in initiative_entries:
+        character_id = data.get('character_id')
+        character_name = data.get('character_name', 'Unknown')
         
-        for doc in all_orders:
-            data = doc.to_dict()
-            character_id = data.get('character_id')
-            character_name = data.get('character_name', 'Unknown')
-            
-            # If character_name not in initiative_order, fetch from characters collection
-            if not character_name or character_name == 'Unknown':
-                char_ref = db_firestore.collection('users').document(user_id).collection('characters').document(str(character_id))
-                char_doc = char_ref.get()
-                if char_doc.exists:
-                    char_data = char_doc.to_dict()
-                    character_name = char_data.get('name', 'Unknown')
-            
-            active_characters.append({
-                "id": str(character_id),
-                "name": character_name,
-                "turn_order": data.get('turn_order', 0)
-            })
+        # If character_name not in initiative_order, use the name from characters collection
+        if not character_name or character_name == 'Unknown':
+            character_name = character_names.get(str(character_id)) or 'Unknown'
         
-        # Sort by turn_order
-        active_characters.sort(key=lambda x: x.get('turn_order', 0))
+        active_characters.append({
+            "id": str(character_id),
+            "name": character_name,
+            "turn_order": data.get('turn_order', 0)
+        })
+    
+    # Sort by turn_order
+    active_characters.sort(key=lambda x: x.get('turn_order', 0))
     
     return {
         "current_turn_character_id": str(current_turn_character_id) if current_turn_character_id else None,
@@ -94,11 +110,101 @@ async def _get_combat_context(db_firestore: Any, user_id: str, session_id: str)
     }
 
 
-@router.post('/analyze')
+def _get_session_characters(db_firestore: Any, user_id: str, session_ref: Any) -> List[Dict[str, Any]]:
+    """
+    Fetch the characters in a session, merged with their character documents.
+    
+    Returns:
+        List of {"id", "name", "starting_hp", "current_hp"} dictionaries
+    """
+    # Get characters in the session from Firestore subcollection
+    session_characters = [doc.to_dict() for doc in session_ref.collection('session_characters').stream()]
+    
+    # Fetch all referenced character documents in one batched read
+    characters_ref = db_firestore.collection('users').document(user_id).collection('characters')
+    char_refs = {
+        str(char_data.get('character_id')): characters_ref.document(str(char_data.get('character_id')))
+        for char_data in session_characters
+    }
+    char_details_by_id = {}
+    if char_refs:
+        for char_doc in db_firestore.get_all(list(char_refs.values()), field_paths=['name', 'max_hp']):
+            if char_doc.exists:
+                char_details_by_id[char_doc.id] = char_doc.to_dict()
+    
+    characters = []
+    for char_data in session_characters:
+        char_details = char_details_by_id.get(str(char_data.get('character_id')))
+        if char_details is not None:
+            characters.append({
+                'id': char_data.get('character_id'),
+                'name': char_data.get('character_name') or char_details.get('name', 'Unknown'),
+                'starting_hp': char_data.get('starting_hp', char_details.get('max_hp', 100)),
+                'current_hp': char_data.get('current_hp', char_details.get('max_hp', 100))
+            })
+    
+    return characters
+
+
+def _save_events(
+    events: List[Dict[str, Any]],
+    session_id: str,
+    user_id: str,
+    db_firestore: Any,
+    session_ref: Any
+) -> List[Dict[str, Any]]:
+    """
+    Validate each analyzed event and persist it through its event type handler.
+    
+    Events with an unknown type, that fail validation, or whose handler raises
+    are logged and skipped.
+    
+    Returns:
+        List of saved event dictionaries
+    """
+    saved_events = []
+    for i, event in enumerate(events, 1):
+        try:
+            # Get the event type handler
+            event_type_raw = event.get('type')
+            event_type = get_event_type_by_name(event_type_raw)
+            if not event_type:
+                logger.warning(f"Event {i}: Unknown event type '{event_type_raw}', skipping")
+                continue
+            
+            # Validate event
+            if not event_type.validate(event):
+                logger.warning(f"Event {i}: Validation failed for type '{event_type_raw}', skipping")
+                logger.debug("Event data: %s", event)
+                continue
+            
+            # Save event using the event type's handler
+            # Pass Firestore session reference and user_id
+            saved_event = event_type.handle_event(
+                event,
+                session_id,  # Pass string session_id
+                user_id,
+                db_firestore,  # Pass Firestore instead of SQLite
+                session_ref  # Pass session reference for subcollections
+            )
+            saved_events.append(saved_event)
+            
+            # Log event description
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("   ✓ Saved event %d: %s", i, event_type.describe(event))
+            
+        except Exception as e:
+            logger.exception(f"   ❌ Failed to save event {i}: {e}")
+            # Continue processing other events even if one fails
+    
+    return saved_events
+
+
+@router.post('/analyze', response_class=ORJSONResponse)
 async def analyze(
     request: AnalyzeRequest,
     user_id: str = Depends(authenticate_token)
-) -> Dict[str, Any]:
+) -> ORJSONResponse:
     """Analyze transcript for damage/healing events."""
     logger.info("=" * 60)
     logger.info(f"📥 Received analyze request from user {user_id}")
@@ -112,9 +218,14 @@ async def analyze(
             logger.error('[ANALYZE] Firestore not initialized')
             raise HTTPException(status_code=500, detail='Firestore not available')
         
-        # Verify session belongs to user in Firestore
+        # Session check, session characters and combat context are independent blocking
+        # Firestore reads, so run them concurrently in the threadpool
         session_ref = db_firestore.collection('users').document(user_id).collection('sessions').document(str(request.session_id))
-        session_doc = session_ref.get()
+        session_doc, characters, combat_context = await asyncio.gather(
+            run_in_threadpool(session_ref.get),
+            run_in_threadpool(_get_session_characters, db_firestore, user_id, session_ref),
+            run_in_threadpool(_get_combat_context, db_firestore, user_id, request.session_id)
+        )
         
         if not session_doc.exists:
             logger.warning(f"Session {request.session_id} not found for user {user_id}")
@@ -122,26 +233,6 @@ async def analyze(
         
         logger.info(f"✓ Session {request.session_id} verified for user {user_id}")
         
-        # Get characters in the session from Firestore subcollection
-        session_characters_ref = session_ref.collection('session_characters')
-        session_characters_docs = session_characters_ref.stream()
-        
-        characters = []
-        for doc in session_characters_docs:
-            char_data = doc.to_dict()
-            # Get character details from Firestore
-            char_ref = db_firestore.collection('users').document(user_id).collection('characters').document(str(char_data.get('character_id')))
-            char_doc = char_ref.get()
-            
-            if char_doc.exists:
-                char_details = char_doc.to_dict()
-                characters.append({
-                    'id': char_data.get('character_id'),
-                    'name': char_data.get('character_name') or char_details.get('name', 'Unknown'),
-                    'starting_hp': char_data.get('starting_hp', char_details.get('max_hp', 100)),
-                    'current_hp': char_data.get('current_hp', char_details.get('max_hp', 100))
-                })
-        
         if not characters:
             logger.warning(f"No characters found in session {request.session_id}")
             raise HTTPException(
@@ -149,26 +240,25 @@ async def analyze(
                 detail='No characters found in session. Add characters to the session first.'
             )
         
-        logger.info(f"✓ Found {len(characters)} character(s) in session: {', '.join([c['name'] for c in characters])}")
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("✓ Found %d character(s) in session: %s", len(characters), ', '.join(c['name'] for c in characters))
         
         # Phase 1: Check for [ALREADY_ANALYZED] marker and extract portion after marker
-        MARKER = '[ALREADY_ANALYZED]'
         transcript_before_marker = ''
         transcript_to_analyze = request.transcript
         
-        if MARKER in request.transcript:
-            logger.info(f"🔍 Found {MARKER} marker in transcript")
-            marker_index = request.transcript.find(MARKER)
+        marker_index = request.transcript.find(_MARKER)
+        if marker_index != -1:
+            logger.info(f"🔍 Found {_MARKER} marker in transcript")
             transcript_before_marker = request.transcript[:marker_index].strip()
-            transcript_after_marker = request.transcript[marker_index + len(MARKER):].strip()
+            transcript_after_marker = request.transcript[marker_index + _MARKER_LEN:].strip()
             transcript_to_analyze = transcript_after_marker
             logger.info(f"   Portion before marker: {len(transcript_before_marker)} chars")
             logger.info(f"   Portion after marker (to analyze): {len(transcript_after_marker)} chars")
         else:
             logger.info("🔍 No marker found in transcript, analyzing full transcript")
         
-        # Get combat context for transcript correction and analysis from Firestore
-        combat_context = await _get_combat_context(db_firestore, user_id, request.session_id)
+        # Log combat context used for transcript correction and analysis
         if combat_context['is_combat_active']:
             logger.info(f"⚔️  Combat is active - Current turn: {combat_context['current_turn_character_name'] or 'None'}, Active characters: {len(combat_context['active_characters'])}")
         else:
@@ -180,9 +270,10 @@ async def analyze(
         logger.info(f"   Input: {len(original_transcript)} chars, {len(original_transcript.split())} words")
         corrected_transcript = await correct_transcript(original_transcript, characters, combat_context)
         
-        # Log both transcripts for debugging (full text at debug level)
-        logger.debug(f"   Original transcript (full): {original_transcript}")
-        logger.debug(f"   Corrected transcript (full): {corrected_transcript}")
+        # Log both transcripts for debugging (full text at debug level; %-style so the
+        # message is only built when DEBUG is enabled)
+        logger.debug("   Original transcript (full): %s", original_transcript)
+        logger.debug("   Corrected transcript (full): %s", corrected_transcript)
         
         # Summary of correction results
         if original_transcript != corrected_transcript:
@@ -208,14 +299,20 @@ async def analyze(
             last_event = None
             last_event_end_pos = -1
             last_event_segment_pos = -1
+            # Events come back in narrative order, so each segment is searched for from
+            # where the latest one ended instead of from the start of the transcript
+            search_start = 0
             
             for event in events:
                 transcript_segment = event.get('transcript_segment', '')
                 if not transcript_segment:
                     continue
                 
-                # Find where this segment appears in the corrected transcript
-                segment_pos = corrected_transcript.find(transcript_segment)
+                # Find where this segment appears in the corrected transcript, falling back
+                # to a full search for an event that is out of order or overlaps the last one
+                segment_pos = corrected_transcript.find(transcript_segment, search_start)
+                if segment_pos == -1 and search_start:
+                    segment_pos = corrected_transcript.find(transcript_segment)
                 if segment_pos == -1:
                     # Segment not found, log warning
                     logger.warning(f"Event transcript_segment not found in corrected transcript: {transcript_segment[:50]}...")
@@ -229,6 +326,7 @@ async def analyze(
                     last_event_end_pos = segment_end_pos
                     last_event_segment_pos = segment_pos
                     last_event = event
+                    search_start = segment_end_pos
             
             if last_event and last_event_end_pos >= 0:
                 # Get the segment text
@@ -283,61 +381,11 @@ async def analyze(
             else:
                 previous_chunk_for_next_analysis = corrected_transcript
         
-        # Save events directly to Firestore instead of returning them to frontend
-        saved_events = []
-        for i, event in enumerate(events, 1):
-            try:
-                # Get the event type handler
-                event_type = get_event_type_by_name(event.get('type'))
-                if not event_type:
-                    logger.warning(f"Event {i}: Unknown event type '{event.get('type')}', skipping")
-                    continue
-                
-                # Validate event
-                if not event_type.validate(event):
-                    logger.warning(f"Event {i}: Validation failed for type '{event.get('type')}', skipping")
-                    logger.debug(f"Event data: {event}")
-                    continue
-                
-                # Save event using the event type's handler
-                # Pass Firestore session reference and user_id
-                saved_event = await event_type.handle_event(
-                    event,
-                    request.session_id,  # Pass string session_id
-                    user_id,
-                    db_firestore,  # Pass Firestore instead of SQLite
-                    session_ref  # Pass session reference for subcollections
-                )
-                saved_events.append(saved_event)
-                
-                # Log event description
-                event_type_name = event.get('type', 'unknown').upper()
-                if event_type_name in ('DAMAGE', 'HEALING'):
-                    event_desc = f"{event_type_name} {event.get('amount', 'N/A')} to {event.get('character_name', 'Unknown')} (ID: {event.get('character_id', 'N/A')})"
-                elif event_type_name == 'INITIATIVE_ROLL':
-                    event_desc = f"{event_type_name} {event.get('initiative_value', 'N/A')} for {event.get('character_name', 'Unknown')} (ID: {event.get('character_id', 'N/A')})"
-                elif event_type_name == 'TURN_ADVANCE':
-                    event_desc = f"{event_type_name} - advancing to next turn"
-                elif event_type_name == 'ROUND_START':
-                    round_num = event.get('round_number', 'N/A')
-                    event_desc = f"{event_type_name} - Round {round_num}"
-                elif event_type_name == 'COMBAT_END':
-                    event_desc = f"{event_type_name} - combat ended"
-                elif event_type_name == 'SPELL_CAST':
-                    spell_name = event.get('spell_name', 'Unknown')
-                    spell_level = event.get('spell_level', 'N/A')
-                    char_name = event.get('character_name', 'Unknown')
-                    event_desc = f"{event_type_name} - {spell_name} (level {spell_level}) by {char_name}"
-                else:
-                    char_name = event.get('character_name', 'Unknown')
-                    char_id = event.get('character_id', 'N/A')
-                    event_desc = f"{event_type_name} for {char_name} (ID: {char_id})"
-                
-                logger.info(f"   ✓ Saved event {i}: {event_desc}")
-                
-            except Exception as e:
-                logger.exception(f"   ❌ Failed to save event {i}: {e}")
-                # Continue processing other events even if one fails
+        # Save events directly to Firestore instead of returning them to frontend.
+        # Handlers make blocking Firestore calls, so run them in the threadpool
+        saved_events = await run_in_threadpool(
+            _save_events, events, request.session_id, user_id, db_firestore, session_ref
+        )
         
         logger.info(f"💾 Saved {len(saved_events)} event(s) to database")
         logger.info("=" * 60)
@@ -352,7 +400,9 @@ async def analyze(
             response['previous_chunk_for_next_analysis'] = previous_chunk_for_next_analysis
             logger.info(f"📦 Returning previous_chunk_for_next_analysis ({len(previous_chunk_for_next_analysis)} chars)")
         
-        return response
+        # Return the response directly so FastAPI skips jsonable_encoder/response
+        # validation; saved events only hold str/int/list/dict values
+        return ORJSONResponse(response)
     
     except HTTPException:
         raise
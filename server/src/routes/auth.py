@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel, EmailStr
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 from ..services.firebase_service import (
     create_user as firebase_create_user,
     authenticate_user as firebase_authenticate_user,
@@ -8,14 +9,18 @@ from ..services.firebase_service import (
 
 router = APIRouter()
 
+# Shape check only ("x@y.z"); Firebase Auth does the authoritative validation.
+# Enforced by pydantic-core's regex engine, so no email_validator call per request.
+EMAIL_PATTERN = r'^[^@\s]+@[^@\s]+\.[^@\s]+$'
+
 
 class RegisterRequest(BaseModel):
-    email: EmailStr
+    email: str = Field(pattern=EMAIL_PATTERN)
     password: str
 
 
 class LoginRequest(BaseModel):
-    email: EmailStr
+    email: str = Field(pattern=EMAIL_PATTERN)
     password: str
 
 
@@ -25,7 +30,7 @@ async def register(request: RegisterRequest):
     email = request.email
     password = request.password
     
-    # Validate email format (Pydantic EmailStr should handle this, but double-check)
+    # Validate email format (the model's EMAIL_PATTERN should handle this, but double-check)
     if not email or '@' not in email:
         raise HTTPException(status_code=400, detail='Invalid email format')
     
@@ -36,8 +41,8 @@ async def register(request: RegisterRequest):
         raise HTTPException(status_code=400, detail='Password must be at least 6 characters')
     
     try:
-        # Create user in Firebase
-        user_data = firebase_create_user(email, password)
+        # Create user in Firebase (blocking Admin SDK calls, so run in the threadpool)
+        user_data = await run_in_threadpool(firebase_create_user, email, password)
         uid = user_data['uid']
         
         # Generate custom JWT token for frontend compatibility
@@ -77,8 +82,8 @@ async def login(request: LoginRequest):
     password = request.password
     
     try:
-        # Authenticate user with Firebase
-        user_data = firebase_authenticate_user(email, password)
+        # Authenticate user with Firebase (blocking HTTP and Admin SDK calls, so run in the threadpool)
+        user_data = await run_in_threadpool(firebase_authenticate_user, email, password)
         uid = user_data['uid']
         user_email = user_data['email']
         
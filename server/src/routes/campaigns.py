@@ -1,11 +1,17 @@
-from fastapi import APIRouter, HTTPException, Depends
-from starlette.requests import Request
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import base64
+import binascii
+import itertools
 import logging
+from datetime import datetime
 from ..middleware.auth import authenticate_token
-from ..db.firebase import get_firestore
+from ..db.firebase import get_firestore, snapshot_to_dict, commit_in_batches
 from firebase_admin import firestore
+from google.api_core.exceptions import NotFound
 from ..services.nano_banana_service import generate_campaign_image
 
 logger = logging.getLogger(__name__)
@@ -13,6 +19,56 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Fields the campaign list (CampaignCard) renders; art_prompt is only needed on the
+# detail view, so list reads skip it
+_CAMPAIGN_LIST_FIELDS = ['name', 'description', 'display_art_url', 'created_at', 'updated_at']
+
+# Fields generate-art reads back; display_art_url and art_prompt are overwritten by
+# the art update, so the previous (possibly large) prompt is never downloaded
+_CAMPAIGN_ART_FIELDS = ['name', 'description', 'created_at', 'updated_at']
+
+# Largest page a client may request from the campaign list
+_CAMPAIGN_PAGE_MAX = 500
+
+# Timestamp fields that campaign, character and session documents may carry
+_TS_FIELDS = ('created_at', 'updated_at', 'started_at', 'ended_at')
+
+
+def _encode_cursor(campaign: Dict[str, Any]) -> str:
+    """Encode a campaign list cursor from the last campaign of a page."""
+    raw = f"{campaign['created_at']}|{campaign['id']}"
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime, str]:
+    """Decode a campaign list cursor into its (created_at, document id) position.
+    
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8')
+    except (binascii.Error, UnicodeError) as e:
+        raise ValueError(f'Malformed cursor: {e}') from e
+    created_at, sep, doc_id = raw.partition('|')
+    if not sep or not doc_id:
+        raise ValueError('Malformed cursor')
+    return datetime.fromisoformat(created_at), doc_id
+
+
+def _delete_and_unlink(db: Any, campaign_ref: Any, linked_docs: List[Any]) -> None:
+    """Delete a campaign and clear campaign_id on its linked documents using batched writes.
+    
+    The delete goes first so its exists precondition shares the first atomic batch with
+    the unlinks: a missing campaign raises NotFound before anything is written.
+    """
+    delete_write = lambda batch: batch.delete(campaign_ref, option=db.write_option(exists=True))
+    unlink_writes = (
+        lambda batch, ref=doc.reference: batch.update(ref, {'campaign_id': None})
+        for doc in linked_docs
+    )
+    commit_in_batches(db, itertools.chain([delete_write], unlink_writes))
+
 
 class CampaignCreate(BaseModel):
     name: str
@@ -25,118 +81,106 @@ class CampaignUpdate(BaseModel):
 
 
 @router.get('/')
-async def get_campaigns(request: Request, user_id: str = Depends(authenticate_token)) -> List[Dict[str, Any]]:
-    """Get all campaigns for the authenticated user."""
+async def get_campaigns(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=_CAMPAIGN_PAGE_MAX),
+    cursor: Optional[str] = Query(None),
+    user_id: str = Depends(authenticate_token)
+) -> List[Dict[str, Any]]:
+    """
+    Get campaigns for the authenticated user, newest first.
+    
+    Without `limit` every campaign is returned. With it, at most `limit` campaigns
+    are returned, and a full page sets the X-Next-Cursor response header to the
+    `cursor` value for the next page.
+    """
     try:
-        # Log request protocol information
-        scheme = request.url.scheme
-        forwarded_proto = request.headers.get('X-Forwarded-Proto', 'not-set')
-        forwarded_for = request.headers.get('X-Forwarded-For', 'not-set')
-        host = request.headers.get('Host', 'not-set')
-        logger.info(f'[Campaigns API] GET /campaigns - Request protocol info: scheme={scheme}, X-Forwarded-Proto={forwarded_proto}, X-Forwarded-For={forwarded_for}, Host={host}')
+        start_after = None
+        if cursor:
+            try:
+                start_after = _decode_cursor(cursor)
+            except ValueError:
+                raise HTTPException(status_code=400, detail='Invalid cursor')
         
         db = get_firestore()
         if not db:
             logger.error('[CAMPAIGNS] Firestore not initialized')
             raise HTTPException(status_code=500, detail='Firestore not available')
         
-        # Query nested collection: users/{user_id}/campaigns
-        docs = db.collection('users').document(user_id).collection('campaigns').stream()
-        
-        campaigns = []
-        for doc in docs:
-            campaign_data = doc.to_dict()
-            campaign_data['id'] = doc.id  # Add document ID
-            
-            # Convert Firestore timestamps to strings
-            if 'created_at' in campaign_data and hasattr(campaign_data['created_at'], 'isoformat'):
-                campaign_data['created_at'] = campaign_data['created_at'].isoformat()
-            if 'updated_at' in campaign_data and hasattr(campaign_data['updated_at'], 'isoformat'):
-                campaign_data['updated_at'] = campaign_data['updated_at'].isoformat()
-            
-            campaigns.append(campaign_data)
-        
-        # Sort by created_at descending
-        campaigns.sort(key=lambda x: x.get('created_at', ''), reverse=True)
+        # Query nested collection: users/{user_id}/campaigns, newest first. Document id
+        # breaks created_at ties so cursors never skip a campaign; both orderings are
+        # served by the automatic single-field index on created_at.
+        campaigns_ref = db.collection('users').document(user_id).collection('campaigns')
+        query = (
+            campaigns_ref
+            .select(_CAMPAIGN_LIST_FIELDS)
+            .order_by('created_at', direction=firestore.Query.DESCENDING)
+            .order_by('__name__', direction=firestore.Query.DESCENDING)
+        )
+        if limit is not None:
+            query = query.limit(limit)
+        if start_after is not None:
+            created_at, doc_id = start_after
+            query = query.start_after({
+                'created_at': created_at,
+                '__name__': campaigns_ref.document(doc_id),
+            })
+        docs = await run_in_threadpool(query.get)
         
-        # Log response being sent
-        logger.info(f'[Campaigns API] GET /campaigns - Sending response with {len(campaigns)} campaign(s), protocol={scheme}, forwarded_proto={forwarded_proto}')
+        campaigns = [snapshot_to_dict(doc, _TS_FIELDS) for doc in docs]
+        if limit is not None and len(campaigns) == limit:
+            response.headers['X-Next-Cursor'] = _encode_cursor(campaigns[-1])
         return campaigns
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f'Error fetching campaigns: {e}')
         raise HTTPException(status_code=500, detail='Internal server error')
 
 
 @router.get('/{campaign_id}')
-async def get_campaign(campaign_id: str, request: Request, user_id: str = Depends(authenticate_token)) -> Dict[str, Any]:
+async def get_campaign(campaign_id: str, user_id: str = Depends(authenticate_token)) -> Dict[str, Any]:
     """Get a single campaign by ID with characters and sessions."""
     try:
-        # Log request protocol information
-        scheme = request.url.scheme
-        forwarded_proto = request.headers.get('X-Forwarded-Proto', 'not-set')
-        logger.info(f'[Campaigns API] GET /campaigns/{campaign_id} - Request protocol info: scheme={scheme}, X-Forwarded-Proto={forwarded_proto}')
-        
         db_firestore = get_firestore()
         if not db_firestore:
             logger.error('[CAMPAIGNS] Firestore not initialized')
             raise HTTPException(status_code=500, detail='Firestore not available')
         
-        # Get campaign from Firestore nested collection
-        campaign_ref = db_firestore.collection('users').document(user_id).collection('campaigns').document(str(campaign_id))
-        campaign_doc = campaign_ref.get()
+        # The campaign, its characters and its sessions are independent reads, so issue
+        # them concurrently instead of one round trip after another
+        user_ref = db_firestore.collection('users').document(user_id)
+        campaign_ref = user_ref.collection('campaigns').document(campaign_id)
+        characters_query = user_ref.collection('characters').where('campaign_id', '==', campaign_id)
+        sessions_query = user_ref.collection('sessions').where('campaign_id', '==', campaign_id)
+        campaign_doc, characters_docs, sessions_docs = await asyncio.gather(
+            run_in_threadpool(campaign_ref.get),
+            run_in_threadpool(characters_query.get),
+            run_in_threadpool(sessions_query.get)
+        )
         
         if not campaign_doc.exists:
             raise HTTPException(status_code=404, detail='Campaign not found')
         
-        campaign = campaign_doc.to_dict()
-        campaign['id'] = campaign_id
-        
-        # Convert Firestore timestamps to strings
-        if 'created_at' in campaign and hasattr(campaign['created_at'], 'isoformat'):
-            campaign['created_at'] = campaign['created_at'].isoformat()
-        if 'updated_at' in campaign and hasattr(campaign['updated_at'], 'isoformat'):
-            campaign['updated_at'] = campaign['updated_at'].isoformat()
-        
-        # Get characters for this campaign from Firestore subcollection
-        characters_docs = db_firestore.collection('users').document(user_id).collection('characters').where('campaign_id', '==', campaign_id).stream()
-        characters = []
-        for doc in characters_docs:
-            char_data = doc.to_dict()
-            char_data['id'] = doc.id
-            # Convert Firestore timestamps to strings
-            if 'created_at' in char_data and hasattr(char_data['created_at'], 'isoformat'):
-                char_data['created_at'] = char_data['created_at'].isoformat()
-            if 'updated_at' in char_data and hasattr(char_data['updated_at'], 'isoformat'):
-                char_data['updated_at'] = char_data['updated_at'].isoformat()
-            characters.append(char_data)
+        campaign = snapshot_to_dict(campaign_doc, _TS_FIELDS)
+        
+        # Characters for this campaign from Firestore subcollection
+        characters = [snapshot_to_dict(doc, _TS_FIELDS) for doc in characters_docs]
         
         # Sort characters by created_at descending
         characters.sort(key=lambda x: x.get('created_at', ''), reverse=True)
         
-        # Get sessions for this campaign from Firestore subcollection
-        sessions_docs = db_firestore.collection('users').document(user_id).collection('sessions').where('campaign_id', '==', campaign_id).stream()
-        sessions = []
-        for doc in sessions_docs:
-            session_data = doc.to_dict()
-            session_data['id'] = doc.id
-            # Convert Firestore timestamps to strings
-            if 'started_at' in session_data and hasattr(session_data['started_at'], 'isoformat'):
-                session_data['started_at'] = session_data['started_at'].isoformat()
-            if 'ended_at' in session_data and hasattr(session_data['ended_at'], 'isoformat'):
-                session_data['ended_at'] = session_data['ended_at'].isoformat()
-            sessions.append(session_data)
+        # Sessions for this campaign from Firestore subcollection
+        sessions = [snapshot_to_dict(doc, _TS_FIELDS) for doc in sessions_docs]
         
         # Sort sessions by started_at descending
         sessions.sort(key=lambda x: x.get('started_at', ''), reverse=True)
         
-        result = {
-            **campaign,
-            'characters': characters,
-            'sessions': sessions
-        }
+        # campaign is already a fresh dict from to_dict(), so extend it in place
+        campaign['characters'] = characters
+        campaign['sessions'] = sessions
+        result = campaign
         
-        # Log response being sent
-        logger.info(f'[Campaigns API] GET /campaigns/{campaign_id} - Sending response, protocol={scheme}, forwarded_proto={forwarded_proto}')
         return result
     except HTTPException:
         raise
@@ -146,16 +190,11 @@ async def get_campaign(campaign_id: str, request: Request, user_id: str = Depend
 
 
 @router.post('/')
-async def create_campaign(campaign: CampaignCreate, request: Request, user_id: str = Depends(authenticate_token)) -> Dict[str, Any]:
+async def create_campaign(campaign: CampaignCreate, user_id: str = Depends(authenticate_token)) -> Dict[str, Any]:
     """Create a new campaign."""
     try:
-        # Log request protocol information
-        scheme = request.url.scheme
-        forwarded_proto = request.headers.get('X-Forwarded-Proto', 'not-set')
         logger.info(f'[CAMPAIGNS] Creating campaign for user_id={user_id}, name={campaign.name}')
-        logger.info(f'[CAMPAIGNS] Campaign data: {campaign.dict()}')
         logger.info(f'[CAMPAIGNS] Storage: Firestore')
-        logger.info(f'[Campaigns API] POST /campaigns - Request protocol info: scheme={scheme}, X-Forwarded-Proto={forwarded_proto}')
         
         if not campaign.name:
             raise HTTPException(status_code=400, detail='Campaign name is required')
@@ -167,37 +206,26 @@ async def create_campaign(campaign: CampaignCreate, request: Request, user_id: s
         
         logger.info(f'[CAMPAIGNS] Got Firestore client')
         
-        # Prepare campaign data for Firestore (no user_id needed - it's in the path)
-        campaign_data = {
-            'name': campaign.name,
-            'description': campaign.description,
-            'created_at': firestore.SERVER_TIMESTAMP,
-            'updated_at': firestore.SERVER_TIMESTAMP,
-        }
-        
-        # Remove None values
-        campaign_data = {k: v for k, v in campaign_data.items() if v is not None}
+        # Prepare campaign data for Firestore (no user_id needed - it's in the path),
+        # leaving out fields that were not provided
+        campaign_data = campaign.model_dump(exclude_none=True)
+        campaign_data['created_at'] = campaign_data['updated_at'] = firestore.SERVER_TIMESTAMP
         
         logger.info(f'[CAMPAIGNS] Saving to Firestore collection: users/{user_id}/campaigns')
-        # Create document in nested collection: users/{user_id}/campaigns
+        # Create document in nested collection: users/{user_id}/campaigns. create() writes
+        # with an exists=False precondition, so a new id can never overwrite a campaign
         campaign_ref = db.collection('users').document(user_id).collection('campaigns').document()
-        campaign_ref.set(campaign_data)
+        write_result = await run_in_threadpool(campaign_ref.create, campaign_data)
         campaign_id = campaign_ref.id
         logger.info(f'[CAMPAIGNS] Campaign saved to Firestore with id={campaign_id}')
         
-        # Fetch the created document to return
-        created_doc = campaign_ref.get()
-        result = created_doc.to_dict()
+        # SERVER_TIMESTAMP fields resolve to the write's commit time, which the write
+        # result already carries, so build the response without refetching the document
+        timestamp = write_result.update_time.isoformat()
+        result = campaign_data
+        result['created_at'] = result['updated_at'] = timestamp
         result['id'] = campaign_id  # Add document ID to result
         
-        # Convert Firestore timestamps to strings for JSON serialization
-        if 'created_at' in result and hasattr(result['created_at'], 'isoformat'):
-            result['created_at'] = result['created_at'].isoformat()
-        if 'updated_at' in result and hasattr(result['updated_at'], 'isoformat'):
-            result['updated_at'] = result['updated_at'].isoformat()
-        
-        # Log response being sent
-        logger.info(f'[Campaigns API] POST /campaigns - Sending response with campaign_id={campaign_id}, protocol={scheme}, forwarded_proto={forwarded_proto}')
         logger.info(f'[CAMPAIGNS] Returning created campaign: {result}')
         return result
     except HTTPException:
@@ -211,59 +239,35 @@ async def create_campaign(campaign: CampaignCreate, request: Request, user_id: s
 async def update_campaign(
     campaign_id: str,
     campaign_update: CampaignUpdate,
-    request: Request,
     user_id: str = Depends(authenticate_token)
 ) -> Dict[str, Any]:
     """Update a campaign."""
     try:
-        # Log request protocol information
-        scheme = request.url.scheme
-        forwarded_proto = request.headers.get('X-Forwarded-Proto', 'not-set')
-        logger.info(f'[Campaigns API] PUT /campaigns/{campaign_id} - Request protocol info: scheme={scheme}, X-Forwarded-Proto={forwarded_proto}')
-        
         db = get_firestore()
         if not db:
             logger.error('[CAMPAIGNS] Firestore not initialized')
             raise HTTPException(status_code=500, detail='Firestore not available')
         
         # Access nested collection: users/{user_id}/campaigns/{campaign_id}
-        campaign_ref = db.collection('users').document(user_id).collection('campaigns').document(str(campaign_id))
-        existing_doc = campaign_ref.get()
+        campaign_ref = db.collection('users').document(user_id).collection('campaigns').document(campaign_id)
         
-        if not existing_doc.exists:
-            raise HTTPException(status_code=404, detail='Campaign not found')
-        
-        # Build update data
-        update_data = {
-            'updated_at': firestore.SERVER_TIMESTAMP,
-        }
-        
-        if campaign_update.name is not None:
-            update_data['name'] = campaign_update.name
-        if campaign_update.description is not None:
-            update_data['description'] = campaign_update.description
-        
-        if len(update_data) == 1:  # Only updated_at
+        # Build update data from the fields that were provided, in one pass over the model
+        update_data = campaign_update.model_dump(exclude_none=True)
+        if not update_data:
             raise HTTPException(status_code=400, detail='No fields to update')
+        update_data['updated_at'] = firestore.SERVER_TIMESTAMP
         
         logger.info(f'[CAMPAIGNS] Updating Firestore document: users/{user_id}/campaigns/{campaign_id}')
-        campaign_ref.update(update_data)
+        # update() fails with NotFound for a missing document, so no existence read first
+        try:
+            await run_in_threadpool(campaign_ref.update, update_data)
+        except NotFound:
+            raise HTTPException(status_code=404, detail='Campaign not found')
         logger.info(f'[CAMPAIGNS] Campaign updated in Firestore')
         
         # Fetch updated document
-        updated_doc = campaign_ref.get()
-        result = updated_doc.to_dict()
-        result['id'] = campaign_id
-        
-        # Convert Firestore timestamps to strings
-        if 'created_at' in result and hasattr(result['created_at'], 'isoformat'):
-            result['created_at'] = result['created_at'].isoformat()
-        if 'updated_at' in result and hasattr(result['updated_at'], 'isoformat'):
-            result['updated_at'] = result['updated_at'].isoformat()
-        
-        # Log response being sent
-        logger.info(f'[Campaigns API] PUT /campaigns/{campaign_id} - Sending response, protocol={scheme}, forwarded_proto={forwarded_proto}')
-        return result
+        updated_doc = await run_in_threadpool(campaign_ref.get)
+        return snapshot_to_dict(updated_doc, _TS_FIELDS)
     except HTTPException:
         raise
     except Exception as e:
@@ -272,34 +276,41 @@ async def update_campaign(
 
 
 @router.delete('/{campaign_id}')
-async def delete_campaign(campaign_id: str, request: Request, user_id: str = Depends(authenticate_token)) -> Dict[str, str]:
+async def delete_campaign(campaign_id: str, user_id: str = Depends(authenticate_token)) -> Dict[str, str]:
     """Delete a campaign."""
     try:
-        # Log request protocol information
-        scheme = request.url.scheme
-        forwarded_proto = request.headers.get('X-Forwarded-Proto', 'not-set')
-        logger.info(f'[Campaigns API] DELETE /campaigns/{campaign_id} - Request protocol info: scheme={scheme}, X-Forwarded-Proto={forwarded_proto}')
-        
         db = get_firestore()
         if not db:
             logger.error('[CAMPAIGNS] Firestore not initialized')
             raise HTTPException(status_code=500, detail='Firestore not available')
         
         # Access nested collection: users/{user_id}/campaigns/{campaign_id}
-        campaign_ref = db.collection('users').document(user_id).collection('campaigns').document(str(campaign_id))
-        existing_doc = campaign_ref.get()
-        
-        if not existing_doc.exists:
-            raise HTTPException(status_code=404, detail='Campaign not found')
+        user_ref = db.collection('users').document(user_id)
+        campaign_ref = user_ref.collection('campaigns').document(campaign_id)
+        
+        # Characters and sessions outlive their campaign but are unlinked from it;
+        # only their references are needed
+        characters_query = user_ref.collection('characters').where('campaign_id', '==', campaign_id).select([])
+        sessions_query = user_ref.collection('sessions').where('campaign_id', '==', campaign_id).select([])
+        characters_docs, sessions_docs = await asyncio.gather(
+            run_in_threadpool(characters_query.get),
+            run_in_threadpool(sessions_query.get)
+        )
         
         logger.info(f'[CAMPAIGNS] Deleting from Firestore: users/{user_id}/campaigns/{campaign_id}')
-        campaign_ref.delete()
-        logger.info(f'[CAMPAIGNS] Campaign deleted from Firestore')
+        # The exists precondition makes the delete itself report a missing document;
+        # it shares the first batch with the unlinks, so nothing is written in that case
+        try:
+            await run_in_threadpool(_delete_and_unlink, db, campaign_ref, characters_docs + sessions_docs)
+        except NotFound:
+            raise HTTPException(status_code=404, detail='Campaign not found')
+        logger.info(
+            f'[CAMPAIGNS] Campaign deleted from Firestore, unlinked {len(characters_docs)} character(s) '
+            f'and {len(sessions_docs)} session(s)'
+        )
         
         result = {'message': 'Campaign deleted successfully'}
         
-        # Log response being sent
-        logger.info(f'[Campaigns API] DELETE /campaigns/{campaign_id} - Sending response, protocol={scheme}, forwarded_proto={forwarded_proto}')
         return result
     except HTTPException:
         raise
@@ -311,7 +322,6 @@ async def delete_campaign(campaign_id: str, request: Request, user_id: str = Dep
 @router.post('/{campaign_id}/generate-art')
 async def generate_campaign_art(
     campaign_id: str,
-    request: Request,
     user_id: str = Depends(authenticate_token)
 ) -> Dict[str, Any]:
     """
@@ -319,61 +329,39 @@ async def generate_campaign_art(
     Updates the campaign with the generated art URL and prompt.
     """
     try:
-        # Log request protocol information
-        scheme = request.url.scheme
-        forwarded_proto = request.headers.get('X-Forwarded-Proto', 'not-set')
-        logger.info(f'[Campaigns API] POST /campaigns/{campaign_id}/generate-art - Request protocol info: scheme={scheme}, X-Forwarded-Proto={forwarded_proto}')
-        
         db = get_firestore()
         if not db:
             logger.error('[CAMPAIGNS] Firestore not initialized')
             raise HTTPException(status_code=500, detail='Firestore not available')
         
-        # Access nested collection: users/{user_id}/campaigns/{campaign_id}
-        campaign_ref = db.collection('users').document(user_id).collection('campaigns').document(str(campaign_id))
-        campaign_doc = campaign_ref.get()
+        # Fetch the campaign and its prompt context concurrently, as get_campaign does.
+        # The prompt only uses how many characters and active sessions the campaign
+        # has, so those are count aggregations rather than document reads.
+        user_ref = db.collection('users').document(user_id)
+        campaign_ref = user_ref.collection('campaigns').document(campaign_id)
+        characters_count_query = (
+            user_ref.collection('characters').where('campaign_id', '==', campaign_id).count()
+        )
+        active_sessions_count_query = (
+            user_ref.collection('sessions')
+            .where('campaign_id', '==', campaign_id)
+            .where('status', '==', 'active')
+            .count()
+        )
+        campaign_doc, characters_count, active_sessions_count = await asyncio.gather(
+            run_in_threadpool(campaign_ref.get, field_paths=_CAMPAIGN_ART_FIELDS),
+            run_in_threadpool(characters_count_query.get),
+            run_in_threadpool(active_sessions_count_query.get)
+        )
         
         if not campaign_doc.exists:
             raise HTTPException(status_code=404, detail='Campaign not found')
         
-        campaign_data = campaign_doc.to_dict()
-        campaign_data['id'] = campaign_id
-        
-        # Get characters for this campaign for context in prompt generation
-        characters_docs = db.collection('users').document(user_id).collection('characters').where('campaign_id', '==', campaign_id).stream()
-        characters = []
-        for doc in characters_docs:
-            char_data = doc.to_dict()
-            char_data['id'] = doc.id
-            # Convert Firestore timestamps to strings
-            if 'created_at' in char_data and hasattr(char_data['created_at'], 'isoformat'):
-                char_data['created_at'] = char_data['created_at'].isoformat()
-            if 'updated_at' in char_data and hasattr(char_data['updated_at'], 'isoformat'):
-                char_data['updated_at'] = char_data['updated_at'].isoformat()
-            characters.append(char_data)
-        
-        # Get sessions for this campaign for context in prompt generation
-        sessions_docs = db.collection('users').document(user_id).collection('sessions').where('campaign_id', '==', campaign_id).stream()
-        sessions = []
-        for doc in sessions_docs:
-            session_data = doc.to_dict()
-            session_data['id'] = doc.id
-            # Convert Firestore timestamps to strings
-            if 'started_at' in session_data and hasattr(session_data['started_at'], 'isoformat'):
-                session_data['started_at'] = session_data['started_at'].isoformat()
-            if 'ended_at' in session_data and hasattr(session_data['ended_at'], 'isoformat'):
-                session_data['ended_at'] = session_data['ended_at'].isoformat()
-            sessions.append(session_data)
-        
-        # Add characters and sessions to campaign data for prompt generation
-        campaign_data['characters'] = characters
-        campaign_data['sessions'] = sessions
-        
-        # Convert Firestore timestamps to strings for prompt generation
-        if 'created_at' in campaign_data and hasattr(campaign_data['created_at'], 'isoformat'):
-            campaign_data['created_at'] = campaign_data['created_at'].isoformat()
-        if 'updated_at' in campaign_data and hasattr(campaign_data['updated_at'], 'isoformat'):
-            campaign_data['updated_at'] = campaign_data['updated_at'].isoformat()
+        campaign_data = snapshot_to_dict(campaign_doc, _TS_FIELDS)
+        
+        # Add character and active session counts to campaign data for prompt generation
+        campaign_data['character_count'] = characters_count[0][0].value
+        campaign_data['active_session_count'] = active_sessions_count[0][0].value
         
         # Generate art using nano banana service
         try:
@@ -381,27 +369,23 @@ async def generate_campaign_art(
             art_result = await generate_campaign_image(campaign_data)
             
             # Update campaign with generated art URL and prompt
-            campaign_ref.update({
+            art_update = {
                 'display_art_url': art_result['image_url'],
                 'art_prompt': art_result['prompt'],
                 'updated_at': firestore.SERVER_TIMESTAMP,
-            })
+            }
+            write_result = await run_in_threadpool(campaign_ref.update, art_update)
             
             logger.info(f'[CAMPAIGNS] Successfully generated and saved banner art for campaign: {campaign_data.get("name", "Unknown")}')
             
-            # Fetch updated campaign
-            updated_doc = campaign_ref.get()
-            result = updated_doc.to_dict()
-            result['id'] = campaign_id
-            
-            # Convert Firestore timestamps to strings
-            if 'created_at' in result and hasattr(result['created_at'], 'isoformat'):
-                result['created_at'] = result['created_at'].isoformat()
-            if 'updated_at' in result and hasattr(result['updated_at'], 'isoformat'):
-                result['updated_at'] = result['updated_at'].isoformat()
+            # Apply the update to the campaign read above instead of fetching it again.
+            # campaign_data already has ISO timestamps; updated_at resolves to the
+            # write's commit time.
+            result = campaign_data
+            del result['character_count'], result['active_session_count']
+            result.update(art_update)
+            result['updated_at'] = write_result.update_time.isoformat()
             
-            # Log response being sent
-            logger.info(f'[Campaigns API] POST /campaigns/{campaign_id}/generate-art - Sending response, protocol={scheme}, forwarded_proto={forwarded_proto}')
             return result
         except Exception as e:
             logger.error(f'[CAMPAIGNS] Error generating campaign banner art: {e}')
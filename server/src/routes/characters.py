@@ -1,11 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Dict, Any, Optional
+import asyncio
 import logging
 from datetime import datetime
 from ..middleware.auth import authenticate_token
-from ..db.firebase import get_firestore
+from ..db.firebase import get_firestore, snapshot_to_dict, timestamps_to_iso
 from firebase_admin import firestore
+from google.api_core.exceptions import NotFound
 from ..services.nano_banana_service import generate_character_image
 
 logger = logging.getLogger(__name__)
@@ -13,6 +16,18 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Fields the character list and its detail sidebar render; art_prompt, ability
+# scores and appearance flavour are only needed by the edit form and art generation,
+# which fetch the single character
+_CHARACTER_LIST_FIELDS = [
+    'name', 'max_hp', 'campaign_id', 'race', 'class_name', 'level', 'ac',
+    'initiative_bonus', 'temp_hp', 'background', 'alignment', 'notes',
+    'display_art_url', 'created_at', 'updated_at',
+]
+
+# Timestamp fields that character documents carry
+_TS_FIELDS = ('created_at', 'updated_at')
+
 
 class CharacterCreate(BaseModel):
     name: str
@@ -97,23 +112,12 @@ async def get_characters(
         logger.info(f'[CHARACTERS] Fetching characters from Firestore for user_id={user_id}, campaign_id={campaign_id}')
         
         # Query nested collection: users/{user_id}/characters
-        query = db.collection('users').document(user_id).collection('characters')
+        query = db.collection('users').document(user_id).collection('characters').select(_CHARACTER_LIST_FIELDS)
         if campaign_id:
             query = query.where('campaign_id', '==', campaign_id)
         
-        docs = query.stream()
-        characters = []
-        for doc in docs:
-            char_data = doc.to_dict()
-            char_data['id'] = doc.id  # Add document ID
-            
-            # Convert Firestore timestamps to strings
-            if 'created_at' in char_data and hasattr(char_data['created_at'], 'isoformat'):
-                char_data['created_at'] = char_data['created_at'].isoformat()
-            if 'updated_at' in char_data and hasattr(char_data['updated_at'], 'isoformat'):
-                char_data['updated_at'] = char_data['updated_at'].isoformat()
-            
-            characters.append(char_data)
+        docs = await run_in_threadpool(query.get)
+        characters = [snapshot_to_dict(doc, _TS_FIELDS) for doc in docs]
         
         # Sort by created_at descending
         characters.sort(key=lambda x: x.get('created_at', ''), reverse=True)
@@ -140,19 +144,12 @@ async def get_character(character_id: str, user_id: str = Depends(authenticate_t
         
         # Access nested collection: users/{user_id}/characters/{character_id}
         character_ref = db.collection('users').document(user_id).collection('characters').document(str(character_id))
-        doc = character_ref.get()
+        doc = await run_in_threadpool(character_ref.get)
         
         if not doc.exists:
             raise HTTPException(status_code=404, detail='Character not found')
         
-        char_data = doc.to_dict()
-        char_data['id'] = doc.id
-        
-        # Convert Firestore timestamps to strings
-        if 'created_at' in char_data and hasattr(char_data['created_at'], 'isoformat'):
-            char_data['created_at'] = char_data['created_at'].isoformat()
-        if 'updated_at' in char_data and hasattr(char_data['updated_at'], 'isoformat'):
-            char_data['updated_at'] = char_data['updated_at'].isoformat()
+        char_data = snapshot_to_dict(doc, _TS_FIELDS)
         
         logger.info(f'[CHARACTERS] Returning character from Firestore')
         return char_data
@@ -168,7 +165,7 @@ async def create_character(character: CharacterCreate, user_id: str = Depends(au
     """Create a new character."""
     try:
         logger.info(f'[CHARACTERS] Creating character for user_id={user_id}, name={character.name}')
-        logger.info(f'[CHARACTERS] Character data: {character.dict()}')
+        logger.debug('[CHARACTERS] Character data: %r', character)
         logger.info(f'[CHARACTERS] Storage: Firestore')
         
         if not character.name or not character.max_hp:
@@ -197,10 +194,10 @@ async def create_character(character: CharacterCreate, user_id: str = Depends(au
         
         logger.info(f'[CHARACTERS] Got Firestore client')
         
-        # Verify campaign belongs to user if provided
+        # Verify campaign belongs to user if provided (existence only, so no fields)
         if character.campaign_id:
             campaign_ref = db.collection('users').document(user_id).collection('campaigns').document(str(character.campaign_id))
-            campaign_doc = campaign_ref.get()
+            campaign_doc = await run_in_threadpool(campaign_ref.get, field_paths=[])
             if not campaign_doc.exists:
                 raise HTTPException(status_code=400, detail='Campaign not found')
         
@@ -245,23 +242,18 @@ async def create_character(character: CharacterCreate, user_id: str = Depends(au
         logger.info(f'[CHARACTERS] Saving to Firestore collection: users/{user_id}/characters')
         # Create document in nested collection: users/{user_id}/characters
         character_ref = db.collection('users').document(user_id).collection('characters').document()
-        character_ref.set(character_data)
+        write_result = await run_in_threadpool(character_ref.set, character_data)
         character_id = character_ref.id
         
         logger.info(f'[CHARACTERS] Character saved to Firestore with id={character_id}')
         
-        # Fetch the created document to return
-        created_doc = character_ref.get()
-        result = created_doc.to_dict()
+        # No read-back: both timestamps are stored as the write's update_time
+        timestamp = write_result.update_time.isoformat()
+        result = character_data
+        result['created_at'] = result['updated_at'] = timestamp
         result['id'] = character_id  # Add document ID to result
         
-        # Convert Firestore timestamps to strings for JSON serialization
-        if 'created_at' in result and hasattr(result['created_at'], 'isoformat'):
-            result['created_at'] = result['created_at'].isoformat()
-        if 'updated_at' in result and hasattr(result['updated_at'], 'isoformat'):
-            result['updated_at'] = result['updated_at'].isoformat()
-        
-        logger.info(f'[CHARACTERS] Returning created character: {result}')
+        logger.debug('[CHARACTERS] Returning created character: %s', result)
         return result
     except HTTPException:
         raise
@@ -279,7 +271,7 @@ async def update_character(
     """Update a character."""
     try:
         logger.info(f'[CHARACTERS] Updating character id={character_id} for user_id={user_id}')
-        logger.info(f'[CHARACTERS] Update data: {character.dict()}')
+        logger.debug('[CHARACTERS] Update data: %r', character)
         logger.info(f'[CHARACTERS] Storage: Firestore')
         
         db = get_firestore()
@@ -289,9 +281,16 @@ async def update_character(
         
         logger.info(f'[CHARACTERS] Got Firestore client')
         
-        # Access nested collection: users/{user_id}/characters/{character_id}
-        character_ref = db.collection('users').document(user_id).collection('characters').document(str(character_id))
-        existing_doc = character_ref.get()
+        # Access nested collection: users/{user_id}/characters/{character_id}. The
+        # character and the campaign it is being linked to are independent reads, so
+        # issue them concurrently; the campaign read only needs to know it exists.
+        user_ref = db.collection('users').document(user_id)
+        character_ref = user_ref.collection('characters').document(str(character_id))
+        reads = [run_in_threadpool(character_ref.get)]
+        if character.campaign_id:
+            campaign_ref = user_ref.collection('campaigns').document(str(character.campaign_id))
+            reads.append(run_in_threadpool(campaign_ref.get, field_paths=[]))
+        existing_doc, *campaign_docs = await asyncio.gather(*reads)
         
         if not existing_doc.exists:
             raise HTTPException(status_code=404, detail='Character not found')
@@ -315,11 +314,8 @@ async def update_character(
             raise HTTPException(status_code=400, detail='initiative_bonus must be a number')
         
         # Verify campaign belongs to user if provided
-        if character.campaign_id:
-            campaign_ref = db.collection('users').document(user_id).collection('campaigns').document(str(character.campaign_id))
-            campaign_doc = campaign_ref.get()
-            if not campaign_doc.exists:
-                raise HTTPException(status_code=400, detail='Campaign not found')
+        if campaign_docs and not campaign_docs[0].exists:
+            raise HTTPException(status_code=400, detail='Campaign not found')
         
         # Prepare update data
         update_data = {
@@ -359,21 +355,19 @@ async def update_character(
         update_data = {k: v for k, v in update_data.items() if v is not None}
         
         logger.info(f'[CHARACTERS] Updating Firestore document: characters/{character_id}')
-        character_ref.update(update_data)
+        write_result = await run_in_threadpool(character_ref.update, update_data)
         logger.info(f'[CHARACTERS] Character updated in Firestore')
         
-        # Fetch updated document
-        updated_doc = character_ref.get()
-        result = updated_doc.to_dict()
+        # Respond with the snapshot read above plus the update, rather than reading back
+        result = existing_doc.to_dict()
+        result.update(update_data)
+        result['updated_at'] = write_result.update_time
         result['id'] = character_id
         
         # Convert Firestore timestamps to strings
-        if 'created_at' in result and hasattr(result['created_at'], 'isoformat'):
-            result['created_at'] = result['created_at'].isoformat()
-        if 'updated_at' in result and hasattr(result['updated_at'], 'isoformat'):
-            result['updated_at'] = result['updated_at'].isoformat()
+        timestamps_to_iso(result, _TS_FIELDS)
         
-        logger.info(f'[CHARACTERS] Returning updated character: {result}')
+        logger.debug('[CHARACTERS] Returning updated character: %s', result)
         return result
     except HTTPException:
         raise
@@ -395,13 +389,13 @@ async def delete_character(character_id: str, user_id: str = Depends(authenticat
         
         # Access nested collection: users/{user_id}/characters/{character_id}
         character_ref = db.collection('users').document(user_id).collection('characters').document(str(character_id))
-        existing_doc = character_ref.get()
-        
-        if not existing_doc.exists:
-            raise HTTPException(status_code=404, detail='Character not found')
         
         logger.info(f'[CHARACTERS] Deleting from Firestore: users/{user_id}/characters/{character_id}')
-        character_ref.delete()
+        # The exists precondition makes the delete itself report a missing document
+        try:
+            await run_in_threadpool(character_ref.delete, option=db.write_option(exists=True))
+        except NotFound:
+            raise HTTPException(status_code=404, detail='Character not found')
         logger.info(f'[CHARACTERS] Character deleted from Firestore')
         
         return {'message': 'Character deleted successfully'}
@@ -429,7 +423,7 @@ async def generate_character_art(
         
         # Access nested collection: users/{user_id}/characters/{character_id}
         character_ref = db.collection('users').document(user_id).collection('characters').document(str(character_id))
-        doc = character_ref.get()
+        doc = await run_in_threadpool(character_ref.get)
         
         if not doc.exists:
             raise HTTPException(status_code=404, detail='Character not found')
@@ -442,22 +436,21 @@ async def generate_character_art(
             art_result = await generate_character_image(character_data)
             
             # Update character with generated art URL and prompt
-            character_ref.update({
+            art_update = {
                 'display_art_url': art_result['image_url'],
                 'art_prompt': art_result['prompt'],
                 'updated_at': firestore.SERVER_TIMESTAMP,
-            })
+            }
+            write_result = await run_in_threadpool(character_ref.update, art_update)
             
-            # Fetch updated character
-            updated_doc = character_ref.get()
-            result = updated_doc.to_dict()
+            # As in update_character, respond from the initial read plus the art update
+            result = doc.to_dict()
+            result.update(art_update)
+            result['updated_at'] = write_result.update_time
             result['id'] = character_id
             
             # Convert Firestore timestamps to strings
-            if 'created_at' in result and hasattr(result['created_at'], 'isoformat'):
-                result['created_at'] = result['created_at'].isoformat()
-            if 'updated_at' in result and hasattr(result['updated_at'], 'isoformat'):
-                result['updated_at'] = result['updated_at'].isoformat()
+            timestamps_to_iso(result, _TS_FIELDS)
             
             return result
         except Exception as e:
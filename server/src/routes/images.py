@@ -41,7 +41,9 @@ async def get_gcs_image(blob_name: str) -> Response:
             content=image_bytes,
             media_type=content_type,
             headers={
-                "Cache-Control": "public, max-age=3600"  # Cache for 1 hour
+                # Blob names carry a random suffix and are never overwritten,
+                # so clients and CDNs can keep them for a year
+                "Cache-Control": "public, max-age=31536000, immutable"
             }
         )
     except FileNotFoundError:
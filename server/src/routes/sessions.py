@@ -551,7 +551,7 @@ async def create_damage_event(
         db = get_database()
         
         # Delegate to event type's handler
-        result = await event_type.handle_event(event_data, session_id, user_id, db)
+        result = event_type.handle_event(event_data, session_id, user_id, db)
         
         return result
             
@@ -609,7 +609,7 @@ async def create_combat_event(
         db = get_database()
         
         # Delegate to event type's handler
-        result = await event_type.handle_event(event_data, session_id, user_id, db)
+        result = event_type.handle_event(event_data, session_id, user_id, db)
         
         return result
             
@@ -706,7 +706,7 @@ async def create_event(
             raise HTTPException(status_code=404, detail='Session not found')
         
         # Delegate to event type's handler (this does all the work)
-        result = await event_type.handle_event(event_data, session_id, user_id, db_firestore, session_ref)
+        result = event_type.handle_event(event_data, session_id, user_id, db_firestore, session_ref)
         
         return result
             
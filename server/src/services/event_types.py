@@ -19,6 +19,7 @@ from abc import ABC, abstractmethod
 from typing import Dict, Any, List, Optional
 from fastapi import HTTPException
 from firebase_admin import firestore
+from ..db.firebase import commit_in_batches
 
 logger = logging.getLogger(__name__)
 
@@ -42,9 +43,32 @@ def save_event_to_firestore(
     Returns:
         Dictionary containing the saved event data with id and timestamp
     """
-    events_ref = session_ref.collection('events')
-    event_doc_ref = events_ref.document()
+    event_doc_ref = session_ref.collection('events').document()
+    event_doc_data = _build_event_doc(event_type, event_data, character_id, character_name)
     
+    # Save to Firestore
+    event_doc_ref.set(event_doc_data)
+    event_id = event_doc_ref.id
+    
+    # Get the created event
+    event_doc = event_doc_ref.get()
+    result = event_doc.to_dict()
+    result['id'] = event_id
+    
+    # Convert Firestore timestamp to string
+    if 'timestamp' in result and hasattr(result['timestamp'], 'isoformat'):
+        result['timestamp'] = result['timestamp'].isoformat()
+    
+    return result
+
+
+def _build_event_doc(
+    event_type: str,
+    event_data: Dict[str, Any],
+    character_id: Optional[str] = None,
+    character_name: Optional[str] = None
+) -> Dict[str, Any]:
+    """Build the Firestore document for an event from its detected data."""
     # Extract character info if not provided
     if not character_id:
         character_id = str(event_data.get('character_id', ''))
@@ -79,23 +103,68 @@ def save_event_to_firestore(
     if 'effect_type' in event_data:
         event_doc_data['effect_type'] = event_data.get('effect_type')
     
-    # Save to Firestore
-    event_doc_ref.set(event_doc_data)
-    event_id = event_doc_ref.id
-    
-    # Get the created event
-    event_doc = event_doc_ref.get()
-    result = event_doc.to_dict()
-    result['id'] = event_id
+    return event_doc_data
+
+
+def save_hp_event_to_firestore(
+    db_firestore: Any,
+    session_ref: Any,
+    session_character_ref: Any,
+    event_type: str,
+    event_data: Dict[str, Any],
+    character_id: str,
+    character_name: str,
+    new_hp: int
+) -> Dict[str, Any]:
+    """Save an HP-changing event and the character's new HP in one batched write.
     
-    # Convert Firestore timestamp to string
-    if 'timestamp' in result and hasattr(result['timestamp'], 'isoformat'):
-        result['timestamp'] = result['timestamp'].isoformat()
+    Args:
+        db_firestore: Firestore database client
+        session_ref: Firestore session document reference
+        session_character_ref: The character's session_characters document reference
+        event_type: Type of event ('damage' or 'healing')
+        event_data: Event data dictionary
+        character_id: Character ID
+        character_name: Character name
+        new_hp: The character's current_hp after the event
     
+    Returns:
+        Dictionary containing the saved event data with id and timestamp
+    """
+    event_doc_ref = session_ref.collection('events').document()
+    event_doc_data = _build_event_doc(event_type, event_data, character_id, character_name)
+    
+    batch = db_firestore.batch()
+    batch.set(event_doc_ref, event_doc_data)
+    batch.update(session_character_ref, {
+        'current_hp': new_hp
+    })
+    write_results = batch.commit()
+    
+    # The event's SERVER_TIMESTAMP resolves to the commit time, which the write
+    # result already carries, so no read-back is needed
+    result = event_doc_data
+    result['timestamp'] = write_results[0].update_time.isoformat()
+    result['id'] = event_doc_ref.id
     return result
 
+def _delete_collection(db_firestore: Any, collection_ref: Any) -> None:
+    """Delete every document in a collection using batched writes.
+    
+    Args:
+        db_firestore: Firestore database client
+        collection_ref: Firestore collection reference to clear
+    """
+    commit_in_batches(
+        db_firestore,
+        (lambda batch, ref=doc.reference: batch.delete(ref) for doc in collection_ref.select([]).stream())
+    )
+
+
 # Registry to hold all registered event types
 _event_registry: Dict[str, 'EventType'] = {}
+# Same registry keyed by lowercased name for case-insensitive lookups
+_event_registry_lower: Dict[str, 'EventType'] = {}
 
 
 class EventType(ABC):
@@ -138,7 +207,7 @@ class EventType(ABC):
         pass
     
     @abstractmethod
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -162,6 +231,10 @@ class EventType(ABC):
             HTTPException: If processing fails
         """
         pass
+    
+    def describe(self, event_data: Dict[str, Any]) -> str:
+        """Returns a one-line, human-readable description of the event for logging."""
+        return f"{self.get_name().upper()} for {event_data.get('character_name', 'Unknown')} (ID: {event_data.get('character_id', 'N/A')})"
 
 
 class DamageEventType(EventType):
@@ -170,6 +243,9 @@ class DamageEventType(EventType):
     def get_name(self) -> str:
         return "damage"
     
+    def describe(self, event_data: Dict[str, Any]) -> str:
+        return f"DAMAGE {event_data.get('amount', 'N/A')} to {event_data.get('character_name', 'Unknown')} (ID: {event_data.get('character_id', 'N/A')})"
+    
     def get_prompt_instructions(self) -> str:
         return """DAMAGE EVENTS:
 - Detect when a character takes damage (loses hit points)
@@ -221,7 +297,7 @@ class DamageEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -262,38 +338,17 @@ class DamageEventType(EventType):
             # Calculate new HP (damage reduces HP, minimum 0)
             new_hp = max(0, current_hp - event_data['amount'])
             
-            # Save event to Firestore subcollection
-            events_ref = session_ref.collection('events')
-            event_doc_ref = events_ref.document()
-            
-            from firebase_admin import firestore
-            event_data_firestore = {
-                'type': 'damage',
-                'character_id': character_id,
-                'character_name': character_name,
-                'amount': event_data['amount'],
-                'transcript_segment': event_data.get('transcript_segment'),
-                'timestamp': firestore.SERVER_TIMESTAMP,
-            }
-            
-            event_doc_ref.set(event_data_firestore)
-            event_id = event_doc_ref.id
-            
-            # Update character's current HP in session_characters
-            session_character_ref.update({
-                'current_hp': new_hp
-            })
-            
-            # Get the created event
-            event_doc = event_doc_ref.get()
-            event_data_result = event_doc.to_dict()
-            event_data_result['id'] = event_id
-            
-            # Convert Firestore timestamp to string
-            if 'timestamp' in event_data_result and hasattr(event_data_result['timestamp'], 'isoformat'):
-                event_data_result['timestamp'] = event_data_result['timestamp'].isoformat()
-            
-            return event_data_result
+            # Write the event and the character's new HP in one batch
+            return save_hp_event_to_firestore(
+                db_firestore,
+                session_ref,
+                session_character_ref,
+                'damage',
+                event_data,
+                character_id,
+                character_name,
+                new_hp
+            )
             
         except Exception as e:
             logger.error(f"Error handling damage event: {e}")
@@ -306,6 +361,9 @@ class HealingEventType(EventType):
     def get_name(self) -> str:
         return "healing"
     
+    def describe(self, event_data: Dict[str, Any]) -> str:
+        return f"HEALING {event_data.get('amount', 'N/A')} to {event_data.get('character_name', 'Unknown')} (ID: {event_data.get('character_id', 'N/A')})"
+    
     def get_prompt_instructions(self) -> str:
         return """HEALING EVENTS:
 - Detect when a character receives healing (gains hit points)
@@ -357,7 +415,7 @@ class HealingEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -399,22 +457,18 @@ class HealingEventType(EventType):
             # Calculate new HP (healing increases HP, maximum max_hp)
             new_hp = min(max_hp, current_hp + event_data['amount'])
             
-            # Save event to Firestore using helper function
-            saved_event = save_event_to_firestore(
+            # Write the event and the character's new HP in one batch
+            return save_hp_event_to_firestore(
+                db_firestore,
                 session_ref,
+                session_character_ref,
                 'healing',
                 event_data,
                 character_id,
-                character_name
+                character_name,
+                new_hp
             )
             
-            # Update character's current HP in session_characters
-            session_character_ref.update({
-                'current_hp': new_hp
-            })
-            
-            return saved_event
-            
         except Exception as e:
             logger.error(f"Error handling healing event: {e}")
             raise HTTPException(status_code=500, detail='Internal server error')
@@ -426,6 +480,9 @@ class InitiativeRollEventType(EventType):
     def get_name(self) -> str:
         return "initiative_roll"
     
+    def describe(self, event_data: Dict[str, Any]) -> str:
+        return f"INITIATIVE_ROLL {event_data.get('initiative_value', 'N/A')} for {event_data.get('character_name', 'Unknown')} (ID: {event_data.get('character_id', 'N/A')})"
+    
     def get_prompt_instructions(self) -> str:
         return """INITIATIVE ROLL EVENTS:
 - Detect when a character rolls for initiative
@@ -470,7 +527,7 @@ class InitiativeRollEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -525,9 +582,7 @@ class InitiativeRollEventType(EventType):
                 combat_state_data = combat_state_doc.to_dict()
                 if not combat_state_data.get('is_active', False):
                     # Clear old initiative order when starting a new combat
-                    initiative_order_ref = session_ref.collection('initiative_order')
-                    for doc in initiative_order_ref.stream():
-                        doc.reference.delete()
+                    _delete_collection(db_firestore, session_ref.collection('initiative_order'))
                     
                     # Reactivate combat
                     combat_state_ref.update({
@@ -562,13 +617,19 @@ class InitiativeRollEventType(EventType):
             # Sort by initiative value (descending), then by character_id for consistency
             initiative_list.sort(key=lambda x: (x['initiative_value'], str(x['character_id'])), reverse=True)
             
-            # Update turn_order for each
-            for idx, item in enumerate(initiative_list, start=1):
-                order_ref = session_ref.collection('initiative_order').document(str(item['character_id']))
-                order_ref.update({
+            # Update turn_order for each using batched writes
+            initiative_order_coll = session_ref.collection('initiative_order')
+            turn_order_updates = [
+                (initiative_order_coll.document(str(item['character_id'])), {
                     'turn_order': idx,
                     'updated_at': firestore.SERVER_TIMESTAMP
                 })
+                for idx, item in enumerate(initiative_list, start=1)
+            ]
+            commit_in_batches(
+                db_firestore,
+                (lambda batch, ref=ref, data=data: batch.update(ref, data) for ref, data in turn_order_updates)
+            )
             
             # Set first character as current turn if not set
             combat_state_data = combat_state_ref.get().to_dict()
@@ -675,6 +736,9 @@ class TurnAdvanceEventType(EventType):
     def get_name(self) -> str:
         return "turn_advance"
     
+    def describe(self, event_data: Dict[str, Any]) -> str:
+        return "TURN_ADVANCE - advancing to next turn"
+    
     def get_prompt_instructions(self) -> str:
         return """TURN ADVANCE EVENTS:
 - Detect ONLY when a character explicitly ENDS their turn (not when a turn is announced or mentioned)
@@ -714,7 +778,7 @@ DO NOT DETECT phrases like:
             return False
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -930,6 +994,9 @@ class RoundStartEventType(EventType):
     def get_name(self) -> str:
         return "round_start"
     
+    def describe(self, event_data: Dict[str, Any]) -> str:
+        return f"ROUND_START - Round {event_data.get('round_number', 'N/A')}"
+    
     def get_prompt_instructions(self) -> str:
         return """ROUND START EVENTS:
 - Detect when a new round of combat begins
@@ -959,7 +1026,7 @@ class RoundStartEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -1096,6 +1163,7 @@ def register_event_type(event_type: EventType) -> None:
     if name in _event_registry:
         logger.warning(f"Event type '{name}' is already registered. Overwriting.")
     _event_registry[name] = event_type
+    _event_registry_lower[name.lower()] = event_type
     logger.info(f"Registered event type: {name}")
 
 
@@ -1120,17 +1188,11 @@ def get_event_type_by_name(name: str) -> Optional[EventType]:
     if not name:
         return None
     
-    # First try exact match (most common case)
-    if name in _event_registry:
-        return _event_registry[name]
-    
-    # Then try case-insensitive lookup
-    name_lower = name.lower()
-    for registered_name, event_type in _event_registry.items():
-        if registered_name.lower() == name_lower:
-            return event_type
-    
-    return None
+    # First try exact match (most common case), then case-insensitive lookup
+    event_type = _event_registry.get(name)
+    if event_type is None:
+        event_type = _event_registry_lower.get(name.lower())
+    return event_type
 
 
 # Register default event types
@@ -1194,7 +1256,7 @@ class StatusConditionAppliedEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -1318,7 +1380,7 @@ class StatusConditionRemovedEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -1394,6 +1456,9 @@ class CombatEndEventType(EventType):
     def get_name(self) -> str:
         return "combat_end"
     
+    def describe(self, event_data: Dict[str, Any]) -> str:
+        return "COMBAT_END - combat ended"
+    
     def get_prompt_instructions(self) -> str:
         return """COMBAT END EVENTS:
 - Detect when combat ends and initiative order is no longer being tracked
@@ -1415,7 +1480,7 @@ class CombatEndEventType(EventType):
             return False
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -1444,16 +1509,12 @@ class CombatEndEventType(EventType):
                     'updated_at': firestore.SERVER_TIMESTAMP
                 })
                 # Clear initiative order when combat ends
-                initiative_order_ref = session_ref.collection('initiative_order')
-                for doc in initiative_order_ref.stream():
-                    doc.reference.delete()
+                _delete_collection(db_firestore, session_ref.collection('initiative_order'))
                 logger.info(f"Combat ended for session {session_id}. Combat state deactivated and initiative order cleared.")
             else:
                 # No combat state exists, that's fine - combat wasn't active
                 # But still clear any leftover initiative order
-                initiative_order_ref = session_ref.collection('initiative_order')
-                for doc in initiative_order_ref.stream():
-                    doc.reference.delete()
+                _delete_collection(db_firestore, session_ref.collection('initiative_order'))
                 logger.info(f"Combat end event for session {session_id}, but no active combat state found. Initiative order cleared.")
             
             # Also try to update SQLite for legacy compatibility (if session_id can be converted)
@@ -1575,7 +1636,7 @@ class BuffDebuffAppliedEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -1812,7 +1873,7 @@ class BuffDebuffRemovedEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
@@ -1909,6 +1970,9 @@ class SpellCastEventType(EventType):
     def get_name(self) -> str:
         return "spell_cast"
     
+    def describe(self, event_data: Dict[str, Any]) -> str:
+        return f"SPELL_CAST - {event_data.get('spell_name', 'Unknown')} (level {event_data.get('spell_level', 'N/A')}) by {event_data.get('character_name', 'Unknown')}"
+    
     def get_prompt_instructions(self) -> str:
         return """SPELL CAST EVENTS:
 - Detect when a character casts a spell
@@ -1952,7 +2016,7 @@ class SpellCastEventType(EventType):
         
         return True
     
-    async def handle_event(
+    def handle_event(
         self,
         event_data: Dict[str, Any],
         session_id: str,
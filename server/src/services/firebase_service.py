@@ -11,15 +11,41 @@ from typing import Optional, Dict, Any
 from firebase_admin import auth as firebase_auth
 from firebase_admin.exceptions import FirebaseError
 from firebase_admin import firestore
-import jwt
+import base64
+import hashlib
+import hmac
+import orjson
 import os
+import time
 import httpx
-from datetime import datetime, timedelta
 
 from ..db.firebase import get_firestore, get_auth
 
 logger = logging.getLogger(__name__)
 
+# Read and encode once at import, like middleware.auth, so a missing secret fails
+# at startup and token signing does no environment lookup per call
+_jwt_secret = os.getenv('JWT_SECRET')
+if not _jwt_secret:
+    raise RuntimeError('JWT_SECRET not configured')
+JWT_SECRET = _jwt_secret.encode('utf-8')
+
+# HS256 tokens always carry the same header, so its base64url segment is built once
+_JWT_HEADER_B64 = base64.urlsafe_b64encode(b'{"alg":"HS256","typ":"JWT"}').rstrip(b'=')
+_JWT_TTL_SECONDS = 7 * 24 * 60 * 60
+
+
+def _b64url(data: bytes) -> bytes:
+    """Base64url-encode without padding, as JWS requires."""
+    return base64.urlsafe_b64encode(data).rstrip(b'=')
+
+
+def _sign_jwt(payload: Dict[str, Any]) -> str:
+    """Sign a payload as an HS256 JWT (same output format as jwt.encode)."""
+    signing_input = _JWT_HEADER_B64 + b'.' + _b64url(orjson.dumps(payload))
+    signature = hmac.new(JWT_SECRET, signing_input, hashlib.sha256).digest()
+    return (signing_input + b'.' + _b64url(signature)).decode('ascii')
+
 
 def create_user(email: str, password: str) -> Dict[str, Any]:
     """
@@ -44,33 +70,18 @@ def create_user(email: str, password: str) -> Dict[str, Any]:
         auth_client = get_auth()
         logger.debug("Firebase Auth client obtained successfully")
         
-        # Check if user already exists
-        logger.debug(f"Checking if user with email {email} already exists")
+        # Create user in Firebase Auth; Firebase enforces unique emails, so rely on
+        # that instead of a get_user_by_email round trip beforehand
+        logger.info(f"Creating new Firebase user for email: {email}")
         try:
-            existing_user = auth_client.get_user_by_email(email)
-            # User exists, raise error
-            logger.warning(f"User with email {email} already exists (UID: {existing_user.uid})")
+            user_record = auth_client.create_user(
+                email=email,
+                password=password,
+                email_verified=False
+            )
+        except firebase_auth.EmailAlreadyExistsError:
+            logger.warning(f"User with email {email} already exists")
             raise ValueError(f"User with email {email} already exists")
-        except firebase_auth.UserNotFoundError:
-            # User doesn't exist, proceed with creation - this is expected
-            logger.debug(f"User with email {email} does not exist, proceeding with creation")
-            pass
-        except ValueError:
-            # Re-raise ValueError (user exists)
-            logger.debug("Re-raising ValueError (user exists)")
-            raise
-        except Exception as e:
-            # For other exceptions when checking, log but continue
-            # Firebase create_user will handle duplicate email errors properly
-            logger.warning(f"Error checking for existing user (will attempt creation anyway): {type(e).__name__}: {e}")
-        
-        # Create user in Firebase Auth
-        logger.info(f"Creating new Firebase user for email: {email}")
-        user_record = auth_client.create_user(
-            email=email,
-            password=password,
-            email_verified=False
-        )
         logger.info(f"Firebase user created successfully: UID={user_record.uid}, email={user_record.email}")
         
         # Create user profile in Firestore (optional - don't fail if Firestore is not available)
@@ -367,15 +378,9 @@ def create_custom_jwt(uid: str, email: str) -> str:
     """
     logger.debug(f"create_custom_jwt called for UID: {uid}, email: {email}")
     
-    jwt_secret = os.getenv('JWT_SECRET')
-    if not jwt_secret:
-        logger.error("JWT_SECRET not configured")
-        raise RuntimeError("JWT_SECRET not configured")
-    logger.debug("JWT_SECRET found")
-    
     # Create JWT with same format as current system
     # Using UID as userId (string) - will need to handle in middleware/routes
-    exp_time = datetime.utcnow() + timedelta(days=7)
+    exp_time = int(time.time()) + _JWT_TTL_SECONDS
     payload = {
         'userId': uid,  # Using Firebase UID as userId
         'email': email,
@@ -383,7 +388,7 @@ def create_custom_jwt(uid: str, email: str) -> str:
     }
     logger.debug(f"Creating JWT with payload: userId={uid}, email={email}, exp={exp_time}")
     
-    token = jwt.encode(payload, jwt_secret, algorithm='HS256')
+    token = _sign_jwt(payload)
     logger.debug("JWT token created successfully")
     return token
 
@@ -232,6 +232,8 @@ def generate_campaign_art_prompt(campaign_data: Dict[str, Any]) -> str:
             - created_at: Creation timestamp (optional, for theme context)
             - characters: List of characters (optional, for context)
             - sessions: List of sessions (optional, for context)
+            - character_count: Number of characters (optional, used instead of characters)
+            - active_session_count: Number of active sessions (optional, used instead of sessions)
     
     Returns:
         JSON string containing the structured prompt
@@ -239,8 +241,13 @@ def generate_campaign_art_prompt(campaign_data: Dict[str, Any]) -> str:
     campaign_name = campaign_data.get('name', 'Campaign')
     description = campaign_data.get('description', '')
     created_at = campaign_data.get('created_at', '')
-    characters = campaign_data.get('characters', [])
-    sessions = campaign_data.get('sessions', [])
+    character_count = campaign_data.get('character_count')
+    if character_count is None:
+        character_count = len(campaign_data.get('characters', []))
+    active_session_count = campaign_data.get('active_session_count')
+    if active_session_count is None:
+        sessions = campaign_data.get('sessions', [])
+        active_session_count = sum(1 for s in sessions if s.get('status') == 'active')
     
     # Extract theme and mood from description
     description_lower = description.lower() if description else ''
@@ -307,12 +314,10 @@ def generate_campaign_art_prompt(campaign_data: Dict[str, Any]) -> str:
     
     # Build campaign context from metadata
     context_parts = []
-    if characters:
-        context_parts.append(f"featuring {len(characters)} adventurer{'s' if len(characters) > 1 else ''}")
-    if sessions:
-        active_sessions = [s for s in sessions if s.get('status') == 'active']
-        if active_sessions:
-            context_parts.append(f"with {len(active_sessions)} active session{'s' if len(active_sessions) > 1 else ''}")
+    if character_count:
+        context_parts.append(f"featuring {character_count} adventurer{'s' if character_count > 1 else ''}")
+    if active_session_count:
+        context_parts.append(f"with {active_session_count} active session{'s' if active_session_count > 1 else ''}")
     
     context_text = ', '.join(context_parts) if context_parts else "an epic D&D campaign"
     
@@ -355,6 +360,8 @@ async def generate_campaign_image(campaign_data: Dict[str, Any]) -> Dict[str, st
             - created_at: Creation timestamp (optional)
             - characters: List of characters (optional)
             - sessions: List of sessions (optional)
+            - character_count: Number of characters (optional)
+            - active_session_count: Number of active sessions (optional)
     
     Returns:
         Dictionary with 'image_url' and 'prompt' keys